@@ -0,0 +1,22 @@
+import sys
+import time
+
+from pythonanywhere_client import PythonAnywhereApi
+from pythonanywhere_client.fake import FakePythonAnywhere
+
+
+def main(calls: int = 200, latency: float = 0.02):
+    with FakePythonAnywhere(latency=latency) as fake:
+        api = fake.attach(PythonAnywhereApi('user', 'token'))
+        api.create_session('benchmark', pool_size=32)
+
+        for workers in (1, 8, 32):
+            start = time.perf_counter()
+            response = api.batch([('list_consoles',)] * calls, workers=workers)
+            elapsed = time.perf_counter() - start
+
+            print(f'batch workers={workers}: {calls / elapsed:.0f} calls/s, error={response.error}')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200, float(sys.argv[2]) if len(sys.argv) > 2 else 0.02)
@@ -0,0 +1,41 @@
+import statistics
+import subprocess
+import sys
+
+LAZY_MODULES = ('selenium', 'httpx')
+
+CHECK = f'''
+import sys
+import pythonanywhere_client
+
+print(','.join(name for name in {LAZY_MODULES!r} if name in sys.modules))
+'''
+
+
+def import_times(runs: int) -> list:
+    times = []
+
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', 'import pythonanywhere_client'],
+            capture_output=True, text=True, check=True
+        )
+        line = [line for line in result.stderr.splitlines() if line.endswith('| pythonanywhere_client')][-1]
+        times.append(int(line.split('|')[1]) / 1000)
+
+    return times
+
+
+def main(runs: int = 10):
+    loaded = subprocess.run([sys.executable, '-c', CHECK], capture_output=True, text=True, check=True).stdout.strip()
+    times = import_times(runs)
+
+    print(f'import pythonanywhere_client: median {statistics.median(times):.1f} ms, min {min(times):.1f} ms')
+
+    if loaded:
+        print(f'eagerly imported optional modules: {loaded}')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
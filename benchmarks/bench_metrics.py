@@ -0,0 +1,24 @@
+import sys
+import timeit
+
+from pythonanywhere_client.metrics import Metrics, endpoint_label
+
+URLS = (
+    ('GET', 'https://www.pythonanywhere.com/user/benchmark/webapps/'),
+    ('POST', 'https://www.pythonanywhere.com/user/benchmark/schedule/task/42/extend'),
+    ('POST', 'https://www.pythonanywhere.com/user/benchmark/webapps/benchmark.pythonanywhere.com/reload'),
+)
+
+
+def main(number: int = 100000):
+    metrics = Metrics()
+
+    label = min(timeit.repeat(lambda: [endpoint_label(method, url) for method, url in URLS], number=number, repeat=3))
+    record = min(timeit.repeat(lambda: metrics.record('get_tasks', 'us', 0.1, 200, 512), number=number, repeat=3))
+
+    print(f'endpoint_label: {label / number / len(URLS) * 1e6:.2f} us per request')
+    print(f'Metrics.record: {record / number * 1e6:.2f} us per request')
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,60 @@
+import datetime
+import re
+import sys
+import timeit
+
+from pythonanywhere_client.webapps import parse_webapps_page
+
+APP_TEMPLATE = '''
+<div class="tab-pane fade" id="id_{name}_pythonanywhere_com">
+  <div class="webapp_header">
+    <h2>Configuration for <a href="https://{name}.pythonanywhere.com/">{name}.pythonanywhere.com</a></h2>
+  </div>
+  <form method="post" action="/user/{user}/webapps/{name}.pythonanywhere.com/reload">
+    <input type="hidden" name="csrfmiddlewaretoken" value="{token}">
+    <button class="btn btn-success webapp_reload">Reload {name}.pythonanywhere.com</button>
+  </form>
+  <p class="webapp_expiry">
+    This site will be disabled on <strong>{expiry}</strong>
+  </p>
+  <form method="post" action="/user/{user}/webapps/{name}.pythonanywhere.com/disable/">
+    <button class="btn btn-danger">Disable {name}.pythonanywhere.com</button>
+  </form>
+  <table class="table"><tr><td>/static/</td><td>/home/{user}/{name}/static</td></tr></table>
+</div>
+'''
+
+
+def synthetic_page(count: int) -> str:
+    expiry = (datetime.date.today() + datetime.timedelta(days=90)).strftime('%A %d %B %Y')
+    apps = ''.join(
+        APP_TEMPLATE.format(name=f'app{index}', user='benchmark', token='x' * 64, expiry=expiry)
+        for index in range(count)
+    )
+
+    return f'<html><body><div class="tab-content">{apps}</div></body></html>'
+
+
+def legacy_expiry(text: str, app_name: str):
+    pattern = f'<div class="tab-pane.*\" id=\"id_{app_name}_pythonanywhere_com">' \
+              f'[\\S\\s]*<p class=\"webapp_expiry\">[\\S\\s]*<strong>(.*)</strong>[\\S\\s]*</div>'
+
+    return re.findall(pattern, text)
+
+
+def main(count: int = 500, lookups: int = 20):
+    text = synthetic_page(count)
+    names = [f'app{index}' for index in range(0, count, max(count // lookups, 1))][:lookups]
+
+    assert len(parse_webapps_page(text)) == count
+
+    legacy = min(timeit.repeat(lambda: [legacy_expiry(text, name) for name in names], number=1, repeat=3))
+    single = min(timeit.repeat(lambda: parse_webapps_page(text), number=1, repeat=3))
+
+    print(f'page: {len(text) / 1024:.0f} KiB, {count} apps, {len(names)} expiry lookups')
+    print(f'legacy regex, one scan per lookup: {legacy * 1000:.1f} ms')
+    print(f'single-pass parser, all apps:      {single * 1000:.1f} ms')
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
@@ -3,20 +3,35 @@ __version__ = '1.1.6'
 import base64
 import calendar
 import datetime
-import json
+import functools
+import itertools
 import re
-import traceback
-from dataclasses import dataclass
-from typing import Union, Optional
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 import requests
+from requests.adapters import HTTPAdapter
 from requests.cookies import cookiejar_from_dict
-from requests.models import Response
-from selenium import webdriver
-from selenium.common.exceptions import TimeoutException
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.expected_conditions import visibility_of_element_located
-from selenium.webdriver.support.ui import WebDriverWait
+
+from pythonanywhere_client.batch import BatchRunner, iter_batch, map_batch
+from pythonanywhere_client.browser import DriverPool
+from pythonanywhere_client.cache import ResponseCache
+from pythonanywhere_client.console import POLL_INTERVAL, run_command, tail_console
+from pythonanywhere_client.download import download_tree
+from pythonanywhere_client.endpoints import ENDPOINTS, Call, Endpoint, create_call, parse_response
+from pythonanywhere_client.files import (
+    DEFAULT_CHUNK_SIZE, MultipartUpload, content_length, iter_response, open_destination
+)
+from pythonanywhere_client.metrics import Metrics, response_size
+from pythonanywhere_client.ratelimit import RateLimiter
+from pythonanywhere_client.reconcile import reconcile_static, reconcile_tasks
+from pythonanywhere_client.response import Response, response_data
+from pythonanywhere_client.sessions import FileSessionStore, dump_cookies, load_cookies, redirected_to_login, session_valid
+from pythonanywhere_client.sync import sync_dir
+from pythonanywhere_client.transport import clone_session, create_adapter, create_session
+from pythonanywhere_client.tree import RemoteWalk
+from pythonanywhere_client.webapps import parse_expiry_date, parse_webapps_page
 
 
 def add_months(date: datetime.date, months: int) -> datetime.date:
@@ -28,39 +43,21 @@ def add_months(date: datetime.date, months: int) -> datetime.date:
     return datetime.datetime(year, month, day).date()
 
 
-def response_data(response: Response):
-    try:
-        return response.json()
-    except json.decoder.JSONDecodeError:
-        if not response.text:
-            return None
-
-        return {'text': response.text}
-
-
 def decode_file_content(content: str) -> bytes:
     return base64.b64decode(content.encode('ascii'))
 
 
-@dataclass
-class Response:
-    status_code: Optional[int] = 200
-    error: Optional[bool] = False
-    data: Optional[Union[dict, list, tuple, None]] = None
-
-    def to_dict(self):
-        return {
-            'status_code': self.status_code,
-            'error': self.error,
-            'data': self.data
-        }
-
-
 class PythonAnywhereApi:
-    def __init__(self, username, token, region='us'):
+    def __init__(self, username, token, region='us', cache: ResponseCache = None):
         self.username = username
         self.token = token
         self.region = region
+        self.cache = cache
+
+        self.session = None
+        self.metrics = None
+        self.middlewares = []
+        self.handler = self.send
 
         if self.region == 'us':
             self.base_url = f'https://www.pythonanywhere.com/api/v0/user/{self.username}'
@@ -72,228 +69,213 @@ class PythonAnywhereApi:
     def create_url(self, uri: str) -> str:
         return f'{self.base_url}{uri}'
 
-    def create_session(self, user_agent: str, timeout: int = 10):
-        self.session = requests.session()
-        self.session.headers = {
-            'User-Agent': user_agent,
-            'Authorization': f'Token {self.token}'
-        }
-        self.session.timeout = timeout
+    def create_session(self, user_agent: str, timeout=10, pool_size: int = 10, retries: int = 3,
+                       backoff_factor: float = 0.5, rate_limiter: RateLimiter = None, metrics: Metrics = None,
+                       adapter: HTTPAdapter = None):
+        self.session = create_session(
+            {
+                'User-Agent': user_agent,
+                'Authorization': f'Token {self.token}'
+            },
+            timeout, pool_size, retries, backoff_factor, rate_limiter, region=self.region, adapter=adapter
+        )
+        self.metrics = metrics
 
-    def create_console(self, executable: str = 'bash', arguments: str = None,
-                       working_directory: str = None) -> Response:
-        url = self.create_url('/consoles/')
+    def rate_limit_wait(self, family: str) -> float:
+        if not self.session.rate_limiter:
+            return 0
 
-        data = {'executable': executable}
+        return self.session.rate_limiter.wait_time(family)
 
-        if arguments:
-            data['arguments'] = arguments
+    def add_middleware(self, middleware):
+        self.middlewares.append(middleware)
+        self.handler = functools.partial(middleware, handler=self.handler)
 
-        if working_directory:
-            data['working_directory'] = working_directory
+    def clone(self):
+        api = type(self)(self.username, self.token, self.region, self.cache)
+        api.base_url = self.base_url
+        api.session = clone_session(self.session)
+        api.metrics = self.metrics
 
-        try:
-            response = self.session.post(url, data=data)
-        except requests.exceptions.RequestException:
-            return Response(
-                status_code=None,
-                error=True,
-                data={'message': traceback.format_exc()}
-            )
+        for middleware in self.middlewares:
+            api.add_middleware(middleware)
 
-        return Response(
-            status_code=response.status_code,
-            error=response.status_code != 201,
-            data=response_data(response)
-        )
+        return api
 
-    def delete_console(self, console_id: int) -> Response:
-        url = self.create_url(f'/consoles/{console_id}/')
+    def send(self, call: Call) -> Response:
+        started = time.perf_counter()
 
         try:
-            response = self.session.delete(url)
-        except requests.exceptions.RequestException:
+            response = self.session.request(call.endpoint.method, call.url, **call.kwargs)
+        except (requests.exceptions.RequestException, OSError) as exception:
+            self._record(call, started, exception=type(exception).__name__)
+
             return Response(
                 status_code=None,
                 error=True,
-                data={'message': traceback.format_exc()}
+                exception=exception
             )
 
-        return Response(
-            status_code=response.status_code,
-            error=response.status_code != 204,
-            data=response_data(response)
-        )
+        if self.metrics is not None:
+            retries = getattr(response.raw, 'retries', None)
+            self._record(call, started, len(retries.history) if retries else 0, response.status_code,
+                         response_size(response, call.kwargs.get('stream', False)))
 
-    def list_consoles(self) -> Response:
-        url = self.create_url('/consoles/')
+        return parse_response(call.endpoint, response)
 
-        try:
-            response = self.session.get(url)
-        except requests.exceptions.RequestException:
-            return Response(
-                status_code=None,
-                error=True,
-                data={'message': traceback.format_exc()}
-            )
+    def _record(self, call: Call, started: float, retries: int = 0, status_code: int = None, size: int = 0,
+                exception: str = None):
+        if self.metrics is not None:
+            self.metrics.record(call.endpoint.name, self.region, time.perf_counter() - started, status_code, size,
+                                retries, exception)
 
-        return Response(
-            status_code=response.status_code,
-            error=response.status_code != 200,
-            data=response_data(response)
-        )
+    def request(self, name: str, fields: dict = None, cached: bool = True, **kwargs) -> Response:
+        call = create_call(self.base_url, name, fields, **kwargs)
+
+        if self.cache is None:
+            return self.handler(call)
+
+        response = self.cache.lookup(call) if cached else None
+
+        if response is None:
+            generation = self.cache.generation(call)
+            response = self.handler(call)
+            self.cache.update(call, response, generation)
+
+        return response
+
+    def create_console(self, executable: str = 'bash', arguments: str = None,
+                       working_directory: str = None) -> Response:
+        data = {'executable': executable}
+
+        if arguments:
+            data['arguments'] = arguments
+
+        if working_directory:
+            data['working_directory'] = working_directory
+
+        return self.request('create_console', data=data)
+
+    def delete_console(self, console_id: int) -> Response:
+        return self.request('delete_console', {'console_id': console_id})
+
+    def list_consoles(self) -> Response:
+        return self.request('list_consoles')
 
     def console_latest_output(self, console_id: int) -> Response:
-        url = self.create_url(f'/consoles/{console_id}/get_latest_output/')
+        return self.request('console_latest_output', {'console_id': console_id})
 
-        try:
-            response = self.session.get(url)
-        except requests.exceptions.RequestException:
-            return Response(
-                status_code=None,
-                error=True,
-                data={'message': traceback.format_exc()}
-            )
+    def tail_console(self, console_id: int, from_start: bool = True, timeout: float = None,
+                     min_interval: float = POLL_INTERVAL, max_interval: float = 10, backoff: float = 1.5):
+        return tail_console(self, console_id, from_start=from_start, timeout=timeout, min_interval=min_interval,
+                            max_interval=max_interval, backoff=backoff)
 
-        return Response(
-            status_code=response.status_code,
-            error=response.status_code != 200,
-            data=response_data(response)
-        )
+    def run_command(self, console_id: int, command: str, timeout: float = 60,
+                    min_interval: float = POLL_INTERVAL, max_interval: float = 5) -> Response:
+        return run_command(self, console_id, command, timeout, min_interval, max_interval)
 
     def console_input(self, console_id: int, input_string: str) -> Response:
-        url = self.create_url(f'/consoles/{console_id}/send_input/')
+        return self.request('console_input', {'console_id': console_id}, data={'input': input_string})
 
-        data = {'input': input_string}
+    def get_file(self, path: str) -> Response:
+        return self.request('get_file', {'path': path})
 
-        try:
-            response = self.session.post(url, data=data)
-        except requests.exceptions.RequestException:
-            return Response(
-                status_code=None,
-                error=True,
-                data={'message': traceback.format_exc()}
-            )
+    def stream_file(self, path: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Response:
+        stream = self.request('stream_file', {'path': path}, stream=True)
+
+        if stream.error:
+            return stream
+
+        response = stream.data['response']
 
         return Response(
-            status_code=response.status_code,
-            error=response.status_code != 200,
-            data=response_data(response)
+            status_code=stream.status_code,
+            error=False,
+            data={
+                'chunks': iter_response(response, chunk_size),
+                'size': content_length(response)
+            }
         )
 
-    def get_file(self, path: str) -> Response:
-        url = self.create_url(f'/files/path{path}')
+    def download_file(self, path: str, destination, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Response:
+        stream = self.stream_file(path, chunk_size)
+
+        if stream.error:
+            return stream
+
+        size = 0
 
         try:
-            response = self.session.get(url)
-        except requests.exceptions.RequestException:
+            with open_destination(destination) as file:
+                for chunk in stream.data['chunks']:
+                    file.write(chunk)
+                    size += len(chunk)
+        except (requests.exceptions.RequestException, OSError) as exception:
             return Response(
                 status_code=None,
                 error=True,
-                data={'message': traceback.format_exc()}
+                exception=exception
             )
 
         return Response(
-            status_code=response.status_code,
-            error=response.status_code != 200,
-            data={'content': base64.b64encode(response.content).decode('ascii')}
+            status_code=stream.status_code,
+            error=False,
+            data={'path': path, 'size': size}
         )
 
-    def create_file(self, path: str, content: bytes) -> Response:
-        url = self.create_url(f'/files/path{path}')
-
-        files = {'content': content}
-
+    def create_file(self, path: str, content, chunk_size: int = DEFAULT_CHUNK_SIZE, progress=None) -> Response:
         try:
-            response = self.session.post(url, files=files)
-        except requests.exceptions.RequestException:
+            body = MultipartUpload(content, chunk_size, progress)
+        except OSError as exception:
             return Response(
                 status_code=None,
                 error=True,
-                data={'message': traceback.format_exc()}
+                exception=exception
             )
 
-        return Response(
-            status_code=response.status_code,
-            error=response.status_code not in (200, 201),
-            data=response_data(response)
-        )
+        return self.request('create_file', {'path': path}, data=body, headers=body.headers)
 
     def delete_file(self, path) -> Response:
-        url = self.create_url(f'/files/path{path}')
+        return self.request('delete_file', {'path': path})
 
-        try:
-            response = self.session.delete(url)
-        except requests.exceptions.RequestException:
-            return Response(
-                status_code=None,
-                error=True,
-                data={'message': traceback.format_exc()}
-            )
+    def batch(self, calls: list, workers: int = 8) -> Response:
+        results = map_batch(self, calls, workers)
 
         return Response(
-            status_code=response.status_code,
-            error=response.status_code != 204,
-            data=response_data(response)
+            error=any(result.error for result in results),
+            data=[result.to_dict() for result in results]
         )
 
-    def can_create_tasks(self) -> Response:
-        url = self.create_url('/user_perms/schedule/')
+    def batch_as_completed(self, calls: list, workers: int = 8):
+        return iter_batch(self, calls, workers)
 
-        try:
-            response = self.session.get(url)
-        except requests.exceptions.RequestException:
-            return Response(
-                status_code=None,
-                error=True,
-                data={'message': traceback.format_exc()}
-            )
+    def download_tree(self, remote_root: str, destination, archive: str = None, workers: int = 8,
+                      chunk_size: int = DEFAULT_CHUNK_SIZE, resume: bool = True, include: tuple = (),
+                      exclude: tuple = ()) -> Response:
+        return download_tree(self, remote_root, destination, archive, workers, chunk_size, resume, include, exclude)
 
-        return Response(
-            status_code=response.status_code,
-            error=response.status_code != 200,
-            data=response_data(response)
-        )
+    def sync_dir(self, local_root: str, remote_root: str, manifest_path: str = None, workers: int = 8,
+                 delete: bool = True, exclude: tuple = ()) -> Response:
+        return sync_dir(self, local_root, remote_root, manifest_path, workers, delete, exclude)
+
+    def can_create_tasks(self) -> Response:
+        return self.request('can_create_tasks')
 
     def get_dir(self, path: str) -> Response:
-        url = self.create_url(f'/files/tree/?path={path}')
+        return self.request('get_dir', {'path': path})
 
-        try:
-            response = self.session.get(url)
-        except requests.exceptions.RequestException:
-            return Response(
-                status_code=None,
-                error=True,
-                data={'message': traceback.format_exc()}
-            )
+    def list_dir(self, path: str) -> Response:
+        return self.request('list_dir', {'path': path})
 
-        return Response(
-            status_code=response.status_code,
-            error=response.status_code != 200,
-            data=response_data(response)
-        )
+    def walk_remote(self, root: str, include: tuple = (), exclude: tuple = (), max_depth: int = None,
+                    workers: int = 8) -> RemoteWalk:
+        return RemoteWalk(self, root, include=include, exclude=exclude, max_depth=max_depth, workers=workers)
 
     def delete_task(self, task_id: int) -> Response:
-        url = self.create_url(f'/schedule/{task_id}/')
-
-        try:
-            response = self.session.delete(url)
-        except requests.exceptions.RequestException:
-            return Response(
-                status_code=None,
-                error=True,
-                data={'message': traceback.format_exc()}
-            )
-
-        return Response(
-            status_code=response.status_code,
-            error=response.status_code != 204,
-        )
+        return self.request('delete_task', {'task_id': task_id})
 
     def create_task(self, command: str, description: str, hour: int, minute: int, enabled: bool = True,
                     interval: str = 'daily') -> Response:
-        url = self.create_url('/schedule/')
-
         data = {
             'command': command,
             'description': description,
@@ -303,276 +285,115 @@ class PythonAnywhereApi:
             'interval': interval
         }
 
-        try:
-            response = self.session.post(url, data=data)
-        except requests.exceptions.RequestException:
-            return Response(
-                status_code=None,
-                error=True,
-                data={'message': traceback.format_exc()}
-            )
-
-        return Response(
-            status_code=response.status_code,
-            error=response.status_code != 201,
-            data=response_data(response)
-        )
-
-    def get_tasks(self) -> Response:
-        url = self.create_url('/schedule/')
-
-        try:
-            response = self.session.get(url)
-        except requests.exceptions.RequestException:
-            return Response(
-                status_code=None,
-                error=True,
-                data={'message': traceback.format_exc()}
-            )
-
-        return Response(
-            status_code=response.status_code,
-            error=response.status_code != 200,
-            data=response_data(response)
-        )
-
-    def reload_app(self, app_name: str):
-        url = self.create_url(f'/webapps/{app_name}.pythonanywhere.com/reload/')
-
-        try:
-            response = self.session.post(url)
-        except requests.exceptions.RequestException:
-            return Response(
-                status_code=None,
-                error=True,
-                data={'message': traceback.format_exc()}
-            )
-
-        data = response_data(response)
-        error = response.status_code != 200 or not (hasattr(data, 'status') or data.get('status') == 'OK')
-
-        return Response(
-            status_code=response.status_code,
-            error=error,
-            data=data
-        )
+        return self.request('create_task', data=data)
 
-    def enable_app(self, app_name: str):
-        url = self.create_url(f'/webapps/{app_name}.pythonanywhere.com/enable/')
+    def update_task(self, task_id: int, command: str = None, description: str = None, hour: int = None,
+                    minute: int = None, enabled: bool = None, interval: str = None) -> Response:
+        data = {
+            'command': command,
+            'description': description,
+            'hour': hour,
+            'minute': minute,
+            'enabled': enabled,
+            'interval': interval
+        }
 
-        try:
-            response = self.session.post(url)
-        except requests.exceptions.RequestException:
-            return Response(
-                status_code=None,
-                error=True,
-                data={'message': traceback.format_exc()}
-            )
+        data = {key: value for key, value in data.items() if value is not None}
 
-        data = response_data(response)
-        error = response.status_code != 200 or not (hasattr(data, 'status') or data.get('status') == 'OK')
+        return self.request('update_task', {'task_id': task_id}, data=data)
 
-        return Response(
-            status_code=response.status_code,
-            error=error,
-            data=data
-        )
-
-    def disable_app(self, app_name: str):
-        url = self.create_url(f'/webapps/{app_name}.pythonanywhere.com/disable/')
-
-        try:
-            response = self.session.post(url)
-        except requests.exceptions.RequestException:
-            return Response(
-                status_code=None,
-                error=True,
-                data={'message': traceback.format_exc()}
-            )
+    def get_tasks(self) -> Response:
+        return self.request('get_tasks')
 
-        data = response_data(response)
-        error = response.status_code != 200 or not (hasattr(data, 'status') or data.get('status') == 'OK')
+    def reconcile_tasks(self, desired: list, workers: int = 8, delete: bool = True) -> Response:
+        return reconcile_tasks(self, desired, workers, delete)
 
-        return Response(
-            status_code=response.status_code,
-            error=error,
-            data=data
-        )
+    def reload_app(self, app_name: str) -> Response:
+        return self.request('reload_app', {'app_name': app_name})
 
-    def get_static_headers(self, app_name: str):
-        url = self.create_url(f'/webapps/{app_name}.pythonanywhere.com/static_headers/')
+    def enable_app(self, app_name: str) -> Response:
+        return self.request('enable_app', {'app_name': app_name})
 
-        try:
-            response = self.session.get(url)
-        except requests.exceptions.RequestException:
-            return Response(
-                status_code=None,
-                error=True,
-                data={'message': traceback.format_exc()}
-            )
+    def disable_app(self, app_name: str) -> Response:
+        return self.request('disable_app', {'app_name': app_name})
 
-        return Response(
-            status_code=response.status_code,
-            error=response.status_code != 200,
-            data=response_data(response)
-        )
+    def get_static_headers(self, app_name: str) -> Response:
+        return self.request('get_static_headers', {'app_name': app_name})
 
     def create_static_header(self, app_name: str, header_url: str, name: str, value: str) -> Response:
-        url = self.create_url(f'/webapps/{app_name}.pythonanywhere.com/static_headers/')
-
         data = {
             'url': header_url,
             'name': name,
             'value': value,
         }
 
-        try:
-            response = self.session.post(url, data=data)
-        except requests.exceptions.RequestException:
-            return Response(
-                status_code=None,
-                error=True,
-                data={'message': traceback.format_exc()}
-            )
-
-        return Response(
-            status_code=response.status_code,
-            error=response.status_code != 201,
-            data=response_data(response)
-        )
+        return self.request('create_static_header', {'app_name': app_name}, data=data)
 
     def delete_static_header(self, app_name: str, header_id: int) -> Response:
-        url = self.create_url(f'/webapps/{app_name}.pythonanywhere.com/static_headers/{header_id}/')
-
-        try:
-            response = self.session.delete(url)
-        except requests.exceptions.RequestException:
-            return Response(
-                status_code=None,
-                error=True,
-                data={'message': traceback.format_exc()}
-            )
-
-        return Response(
-            status_code=response.status_code,
-            error=response.status_code != 204,
-            data=response_data(response)
-        )
+        return self.request('delete_static_header', {'app_name': app_name, 'header_id': header_id})
 
     def get_static_header(self, app_name: str, header_id: int) -> Response:
-        url = self.create_url(f'/webapps/{app_name}.pythonanywhere.com/static_headers/{header_id}/')
+        return self.request('get_static_header', {'app_name': app_name, 'header_id': header_id})
 
-        try:
-            response = self.session.get(url)
-        except requests.exceptions.RequestException:
-            return Response(
-                status_code=None,
-                error=True,
-                data={'message': traceback.format_exc()}
-            )
-
-        return Response(
-            status_code=response.status_code,
-            error=response.status_code != 200,
-            data=response_data(response)
-        )
-
-    def get_static_paths(self, app_name: str):
-        url = self.create_url(f'/webapps/{app_name}.pythonanywhere.com/static_files/')
-
-        try:
-            response = self.session.get(url)
-        except requests.exceptions.RequestException:
-            return Response(
-                status_code=None,
-                error=True,
-                data={'message': traceback.format_exc()}
-            )
-
-        return Response(
-            status_code=response.status_code,
-            error=response.status_code != 200,
-            data=response_data(response)
-        )
+    def get_static_paths(self, app_name: str) -> Response:
+        return self.request('get_static_paths', {'app_name': app_name})
 
     def create_static_path(self, app_name: str, static_path_url: str, path: str) -> Response:
-        url = self.create_url(f'/webapps/{app_name}.pythonanywhere.com/static_files/')
-
         data = {
             'url': static_path_url,
             'path': path,
         }
 
-        try:
-            response = self.session.post(url, data=data)
-        except requests.exceptions.RequestException:
-            return Response(
-                status_code=None,
-                error=True,
-                data={'message': traceback.format_exc()}
-            )
-
-        return Response(
-            status_code=response.status_code,
-            error=response.status_code != 201,
-            data=response_data(response)
-        )
+        return self.request('create_static_path', {'app_name': app_name}, data=data)
 
     def delete_static_path(self, app_name: str, static_path_id: int) -> Response:
-        url = self.create_url(f'/webapps/{app_name}.pythonanywhere.com/static_files/{static_path_id}/')
-
-        try:
-            response = self.session.delete(url)
-        except requests.exceptions.RequestException:
-            return Response(
-                status_code=None,
-                error=True,
-                data={'message': traceback.format_exc()}
-            )
-
-        return Response(
-            status_code=response.status_code,
-            error=response.status_code != 204,
-            data=response_data(response)
-        )
+        return self.request('delete_static_path', {'app_name': app_name, 'static_path_id': static_path_id})
 
     def get_static_path(self, app_name: str, static_path_id: int) -> Response:
-        url = self.create_url(f'/webapps/{app_name}.pythonanywhere.com/static_files/{static_path_id}/')
-
-        try:
-            response = self.session.get(url)
-        except requests.exceptions.RequestException:
-            return Response(
-                status_code=None,
-                error=True,
-                data={'message': traceback.format_exc()}
-            )
+        return self.request('get_static_path', {'app_name': app_name, 'static_path_id': static_path_id})
 
-        return Response(
-            status_code=response.status_code,
-            error=response.status_code != 200,
-            data=response_data(response)
-        )
+    def reconcile_static(self, desired: dict, workers: int = 8, reload: bool = True) -> Response:
+        return reconcile_static(self, desired, workers, reload)
 
 
 class PythonAnywhereWeb:
     BASE_URL = 'https://www.pythonanywhere.com'
 
-    def __init__(self, username, password):
+    def __init__(self, username, password, session_store: FileSessionStore = None):
         self.username = username
         self.password = password
+        self.session_store = session_store
 
         self.session = None
         self.selenium = None
+        self.driver_pool = None
+        self.cached_csrf_token = None
+        self.refreshed_csrf_tokens = {}
+        self.csrf_lock = threading.Lock()
+        self.login_lock = threading.Lock()
+        self.login_count = 0
 
-    @staticmethod
-    def create_url(uri: str) -> str:
-        return f'{PythonAnywhereWeb.BASE_URL}{uri}'
-
-    def create_session(self, user_agent: str, timeout: int = 10):
-        self.session = requests.session()
-        self.session.headers = {'User-Agent': user_agent}
-        self.session.timeout = timeout
+    def create_url(self, uri: str) -> str:
+        return f'{self.BASE_URL}{uri}'
+
+    def create_session(self, user_agent: str, timeout=10, pool_size: int = 10, retries: int = 3,
+                       backoff_factor: float = 0.5, metrics: Metrics = None):
+        self.session = create_session({'User-Agent': user_agent}, timeout, pool_size, retries, backoff_factor,
+                                      metrics=metrics)
+        self.cached_csrf_token = None
+
+    def clone(self):
+        web = type(self)(self.username, self.password, self.session_store)
+        web.BASE_URL = self.BASE_URL
+        web.session = clone_session(self.session)
+        web.session.cookies = self.session.cookies
+        web.cached_csrf_token = self.cached_csrf_token
+        web.refreshed_csrf_tokens = self.refreshed_csrf_tokens
+        web.csrf_lock = self.csrf_lock
+        web.login_lock = self.login_lock
+        web.login_count = self.login_count
+
+        return web
 
     @staticmethod
     def extract_csrf_token(response_text: str) -> str:
@@ -587,37 +408,98 @@ class PythonAnywhereWeb:
 
     def load_cookies(self, cookies: dict):
         self.session.cookies.update(cookiejar_from_dict(cookies))
+        self.cached_csrf_token = None
+
+    def restore_session(self) -> bool:
+        if not self.session_store:
+            return False
+
+        cookies = self.session_store.load(self.username)
+
+        if not cookies or not session_valid(cookies):
+            return False
+
+        load_cookies(self.session.cookies, cookies)
+        self.cached_csrf_token = None
+
+        return True
+
+    def save_session(self):
+        if self.session_store:
+            try:
+                self.session_store.save(self.username, dump_cookies(self.session.cookies))
+            except OSError:
+                pass
+
+    def ensure_login(self) -> Response:
+        if self.restore_session():
+            return Response(error=False)
+
+        return self.login()
+
+    def relogin(self, login_count: int) -> bool:
+        with self.login_lock:
+            if self.login_count != login_count:
+                return True
+
+            return not self.login().error
+
+    def request(self, method: str, url: str, **kwargs):
+        login_count = self.login_count
+        response = self.session.request(method, url, **kwargs)
+
+        if redirected_to_login(response) and self.relogin(login_count):
+            response = self.session.request(method, url, **kwargs)
+
+        return response
+
+    @staticmethod
+    def create_selenium():
+        from selenium import webdriver
 
-    def setup_selenium(self):
         options = webdriver.ChromeOptions()
         options.add_argument("--no-sandbox")
         options.add_argument("--headless")
         options.add_argument("--disable-gpu")
 
-        self.selenium = webdriver.Chrome(options=options)
+        return webdriver.Chrome(options=options)
+
+    def setup_selenium(self):
+        self.selenium = self.create_selenium()
+
+    def create_driver_pool(self, size: int = 2, max_uses: int = 50, warm: bool = False) -> DriverPool:
+        self.close_driver_pool()
+        self.driver_pool = DriverPool(self.create_selenium, size, max_uses)
+
+        if warm:
+            self.driver_pool.warm()
+
+        return self.driver_pool
+
+    def close_driver_pool(self):
+        if self.driver_pool:
+            self.driver_pool.close()
+            self.driver_pool = None
+
+    def add_selenium_cookies(self, driver=None):
+        driver = driver or self.selenium
 
-    def add_selenium_cookies(self):
         for name, value in self.get_cookies().items():
-            self.selenium.add_cookie({'name': name, 'value': value})
+            driver.add_cookie({'name': name, 'value': value})
 
     def logout(self) -> Response:
         url = self.create_url('/logout/')
+        headers = {'Referer': self.create_url('/')}
 
-        csrf_token = self.get_csrf_token()
+        response, failure = self.csrf_post(url, headers, allow_redirects=False)
 
-        if csrf_token.error:
-            return csrf_token
+        if failure:
+            return failure
 
-        try:
-            data = {'csrfmiddlewaretoken': csrf_token.data['csrf_token']}
-            headers = {'Referer': self.create_url('/')}
-            response = self.session.post(url, data=data, headers=headers, allow_redirects=False)
-        except requests.exceptions.RequestException:
-            return Response(
-                status_code=None,
-                error=True,
-                data={'message': traceback.format_exc()}
-            )
+        self.cached_csrf_token = None
+
+        if self.session_store:
+            self.session_store.delete(self.username)
 
         return Response(
             status_code=response.status_code,
@@ -629,11 +511,11 @@ class PythonAnywhereWeb:
 
         try:
             response = self.session.get(url)
-        except requests.exceptions.RequestException:
+        except requests.exceptions.RequestException as exception:
             return Response(
                 status_code=None,
                 error=True,
-                data={'message': traceback.format_exc()}
+                exception=exception
             )
 
         csrf_token = self.extract_csrf_token(response.text)
@@ -656,11 +538,11 @@ class PythonAnywhereWeb:
 
         try:
             response = self.session.post(url, data=data, headers=headers)
-        except requests.exceptions.RequestException:
+        except requests.exceptions.RequestException as exception:
             return Response(
                 status_code=None,
                 error=True,
-                data={'message': traceback.format_exc()}
+                exception=exception
             )
 
         if response.status_code != 200:
@@ -680,40 +562,72 @@ class PythonAnywhereWeb:
                 data={'message': 'The user name or password is incorrect'}
             )
 
+        self.cached_csrf_token = None
+        self.login_count += 1
+        self.save_session()
+
         return Response(
             status_code=response.status_code,
             error=False
         )
 
-    def get_app_expiry_date(self, app_name: str) -> Response:
+    def get_webapps_page(self):
         url = self.create_url(f'/user/{self.username}/webapps/')
 
         try:
-            response = self.session.get(url)
-        except requests.exceptions.RequestException:
-            return Response(
+            response = self.request('GET', url)
+        except requests.exceptions.RequestException as exception:
+            return None, Response(
                 status_code=None,
                 error=True,
-                data={'message': traceback.format_exc()}
+                exception=exception
             )
 
         if response.status_code != 200:
-            return Response(
+            return None, Response(
                 status_code=response.status_code,
                 error=True,
                 data={'message': 'Get app page failed'}
             )
 
-        pattern = f'<div class="tab-pane.*\" id=\"id_{app_name}_pythonanywhere_com">' \
-                  f'[\\S\\s]*<p class=\"webapp_expiry\">[\\S\\s]*<strong>(.*)</strong>[\\S\\s]*</div>'
-        result = re.findall(pattern, response.text)
+        return response, None
 
-        if result:
+    def get_webapps_overview(self) -> Response:
+        response, failure = self.get_webapps_page()
+
+        if failure:
+            return failure
+
+        apps = {}
+
+        for domain, app in parse_webapps_page(response.text).items():
+            try:
+                expiry_date = parse_expiry_date(app['expiry']) if app['expiry'] else None
+            except ValueError:
+                expiry_date = None
+
+            apps[domain] = {'domain': domain, 'expiry_date': expiry_date, 'status': app['status']}
+
+        return Response(
+            status_code=response.status_code,
+            error=False,
+            data=apps
+        )
+
+    def get_app_expiry_date(self, app_name: str) -> Response:
+        response, failure = self.get_webapps_page()
+
+        if failure:
+            return failure
+
+        app = parse_webapps_page(response.text).get(f'{app_name}.pythonanywhere.com')
+
+        if app and app['expiry']:
             try:
                 return Response(
                     status_code=response.status_code,
                     error=False,
-                    data={'expiry_date': datetime.datetime.strptime(result[0], '%A %d %B %Y').date()}
+                    data={'expiry_date': parse_expiry_date(app['expiry'])}
                 )
             except ValueError:
                 return Response(
@@ -728,23 +642,10 @@ class PythonAnywhereWeb:
         )
 
     def get_csrf_token(self) -> Response:
-        app_url = self.create_url(f'/user/{self.username}/webapps/')
+        response, failure = self.get_webapps_page()
 
-        try:
-            response = self.session.get(app_url)
-        except requests.exceptions.RequestException:
-            return Response(
-                status_code=None,
-                error=True,
-                data={'message': traceback.format_exc()}
-            )
-
-        if response.status_code != 200:
-            return Response(
-                status_code=response.status_code,
-                error=True,
-                data={'message': 'Get app page failed'}
-            )
+        if failure:
+            return failure
 
         csrf_token = self.extract_csrf_token(response.text)
 
@@ -755,30 +656,81 @@ class PythonAnywhereWeb:
                 data={'message': 'CSRF token extraction failed'}
             )
 
+        self.cached_csrf_token = csrf_token
+
         return Response(
             status_code=response.status_code,
             error=False,
             data={'csrf_token': csrf_token}
         )
 
-    def reload_app(self, app_name: str) -> Response:
-        csrf_token = self.get_csrf_token()
+    def get_cached_csrf_token(self) -> Response:
+        if not self.cached_csrf_token:
+            try:
+                self.cached_csrf_token = self.session.cookies.get('csrftoken')
+            except requests.cookies.CookieConflictError:
+                self.cached_csrf_token = None
+
+        if not self.cached_csrf_token:
+            return self.get_csrf_token()
+
+        return Response(
+            error=False,
+            data={'csrf_token': self.cached_csrf_token}
+        )
+
+    def csrf_post(self, url: str, headers: dict, **kwargs):
+        csrf_token = self.get_cached_csrf_token()
+
+        for refresh in (True, False):
+            if csrf_token.error:
+                return None, csrf_token
+
+            try:
+                data = {'csrfmiddlewaretoken': csrf_token.data['csrf_token']}
+                response = self.request('POST', url, data=data, headers=headers, **kwargs)
+            except requests.exceptions.RequestException as exception:
+                return None, Response(
+                    status_code=None,
+                    error=True,
+                    exception=exception
+                )
+
+            if response.status_code != 403 or not refresh:
+                break
+
+            csrf_token = self.refresh_csrf_token(csrf_token.data['csrf_token'])
+
+        return response, None
+
+    def refresh_csrf_token(self, stale_token: str) -> Response:
+        with self.csrf_lock:
+            csrf_token = self.refreshed_csrf_tokens.get(stale_token)
+
+            if csrf_token:
+                self.cached_csrf_token = csrf_token
+
+                return Response(
+                    error=False,
+                    data={'csrf_token': csrf_token}
+                )
+
+            self.cached_csrf_token = None
+            csrf_token = self.get_csrf_token()
+
+            if not csrf_token.error:
+                self.refreshed_csrf_tokens[stale_token] = csrf_token.data['csrf_token']
 
-        if csrf_token.error:
             return csrf_token
 
+    def reload_app(self, app_name: str) -> Response:
         url = self.create_url(f'/user/{self.username}/webapps/{app_name}.pythonanywhere.com/reload')
-        data = {'csrfmiddlewaretoken': csrf_token.data['csrf_token']}
         headers = {'Referer': self.create_url(f'/user/{self.username}/webapps/')}
 
-        try:
-            response = self.session.post(url, data=data, headers=headers)
-        except requests.exceptions.RequestException:
-            return Response(
-                status_code=None,
-                error=True,
-                data={'message': traceback.format_exc()}
-            )
+        response, failure = self.csrf_post(url, headers)
+
+        if failure:
+            return failure
 
         if response.status_code != 200 or response.text != 'OK':
             return Response(
@@ -793,23 +745,13 @@ class PythonAnywhereWeb:
         )
 
     def extend_app(self, app_name: str) -> Response:
-        csrf_token = self.get_csrf_token()
-
-        if csrf_token.error:
-            return csrf_token
-
         url = self.create_url(f'/user/{self.username}/webapps/{app_name}.pythonanywhere.com/extend')
-        data = {'csrfmiddlewaretoken': csrf_token.data['csrf_token']}
         headers = {'Referer': self.create_url(f'/user/{self.username}/webapps/')}
 
-        try:
-            response = self.session.post(url, data=data, headers=headers)
-        except requests.exceptions.RequestException:
-            return Response(
-                status_code=None,
-                error=True,
-                data={'message': traceback.format_exc()}
-            )
+        response, failure = self.csrf_post(url, headers)
+
+        if failure:
+            return failure
 
         if response.status_code != 200:
             return Response(
@@ -824,23 +766,13 @@ class PythonAnywhereWeb:
         )
 
     def extend_task(self, task_id: int) -> Response:
-        csrf_token = self.get_csrf_token()
-
-        if csrf_token.error:
-            return csrf_token
-
         url = self.create_url(f'/user/{self.username}/schedule/task/{task_id}/extend')
-        data = {'csrfmiddlewaretoken': csrf_token.data['csrf_token']}
         headers = {'Referer': self.create_url(f'/user/{self.username}/tasks_tab/')}
 
-        try:
-            response = self.session.post(url, data=data, headers=headers)
-        except requests.exceptions.RequestException:
-            return Response(
-                status_code=None,
-                error=True,
-                data={'message': traceback.format_exc()}
-            )
+        response, failure = self.csrf_post(url, headers)
+
+        if failure:
+            return failure
 
         if response.status_code != 200 or response.json()['status'] != 'success':
             return Response(
@@ -854,36 +786,199 @@ class PythonAnywhereWeb:
             error=False
         )
 
-    def start_console(self, console_id: int, timeout: int = 60):
-        url = self.create_url(f'/user/{self.username}/consoles/{console_id}/frame/')
+    def run_bulk(self, action: str, items: list, workers: int = 8) -> Response:
+        csrf_token = self.get_cached_csrf_token()
+
+        if csrf_token.error:
+            return csrf_token
+
+        results = dict(zip(items, map_batch(self, [(action, item) for item in items], workers)))
+
+        return Response(
+            error=any(result.error for result in results.values()),
+            data={item: result.to_dict() for item, result in results.items()}
+        )
+
+    def extend_all_apps(self, app_names: list, workers: int = 8) -> Response:
+        return self.run_bulk('extend_app', app_names, workers)
+
+    def extend_all_tasks(self, task_ids: list, workers: int = 8) -> Response:
+        return self.run_bulk('extend_task', task_ids, workers)
+
+    def acquire_selenium(self):
+        if self.driver_pool:
+            return self.driver_pool.acquire()
 
         self.setup_selenium()
 
-        try:
-            self.selenium.get(self.BASE_URL)
-            self.add_selenium_cookies()
+        return self.selenium
 
-            self.selenium.get(url)
+    def release_selenium(self, driver, healthy: bool = True):
+        if self.driver_pool:
+            self.driver_pool.release(driver, healthy)
+        else:
+            driver.quit()
 
-            self.selenium.switch_to.frame(0)
+    def open_console_tabs(self, driver, console_ids: list, timeout: int = 60) -> dict:
+        from selenium.common.exceptions import TimeoutException
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support.expected_conditions import visibility_of_element_located
+        from selenium.webdriver.support.ui import WebDriverWait
 
-            WebDriverWait(self.selenium, timeout).until(
-                visibility_of_element_located((By.XPATH, "//x-row[contains(text(), '~')]"))
-            )
+        if not driver.current_url.startswith(self.BASE_URL):
+            driver.get(self.BASE_URL)
 
-            return Response(error=False)
+        self.add_selenium_cookies(driver)
 
-        except TimeoutException:
-            return Response(
-                status_code=None,
-                error=True,
-                data={'message': 'Timed out waiting for console to start.'}
-            )
-        except Exception:
-            return Response(
+        handles = {}
+
+        for console_id in console_ids:
+            if handles:
+                driver.switch_to.new_window('tab')
+
+            driver.get(self.create_url(f'/user/{self.username}/consoles/{console_id}/frame/'))
+            handles[console_id] = driver.current_window_handle
+
+        results = {}
+
+        for console_id, handle in handles.items():
+            driver.switch_to.window(handle)
+            driver.switch_to.frame(0)
+
+            try:
+                WebDriverWait(driver, timeout).until(
+                    visibility_of_element_located((By.XPATH, "//x-row[contains(text(), '~')]"))
+                )
+
+                results[console_id] = Response(error=False)
+            except TimeoutException:
+                results[console_id] = Response(
+                    status_code=None,
+                    error=True,
+                    data={'message': 'Timed out waiting for console to start.'}
+                )
+
+        first, *others = handles.values()
+
+        for handle in others:
+            driver.switch_to.window(handle)
+            driver.close()
+
+        driver.switch_to.window(first)
+
+        return results
+
+    def launch_consoles(self, console_ids: list, timeout: int = 60):
+        driver = self.acquire_selenium()
+        healthy = False
+
+        try:
+            results = self.open_console_tabs(driver, console_ids, timeout)
+            healthy = True
+
+            return results, None
+        except Exception as exception:
+            return None, Response(
                 status_code=None,
                 error=True,
-                data={'message': traceback.format_exc()}
+                exception=exception
             )
         finally:
-            self.selenium.quit()
+            self.release_selenium(driver, healthy)
+
+    def start_console(self, console_id: int, timeout: int = 60) -> Response:
+        results, failure = self.launch_consoles([console_id], timeout)
+
+        if failure:
+            return failure
+
+        return results[console_id]
+
+    def start_consoles(self, console_ids: list, timeout: int = 60) -> Response:
+        results, failure = self.launch_consoles(console_ids, timeout)
+
+        if failure:
+            return failure
+
+        return Response(
+            error=any(result.error for result in results.values()),
+            data={console_id: result.to_dict() for console_id, result in results.items()}
+        )
+
+
+class PythonAnywhereFleet:
+    def __init__(self, accounts: list, workers: int = 16, per_account: int = 2):
+        self.workers = workers
+        self.per_account = per_account
+
+        self.apis = {}
+        self.runners = {}
+        self.semaphores = {}
+        self.adapters = {}
+
+        for account in accounts:
+            api = PythonAnywhereApi(*account)
+
+            self.apis[api.username] = api
+            self.semaphores[api.username] = threading.BoundedSemaphore(per_account)
+
+    def create_session(self, user_agent: str, timeout=10, retries: int = 3, backoff_factor: float = 0.5,
+                       rate_limits: dict = None, metrics: Metrics = None):
+        self.close()
+
+        for api in self.apis.values():
+            if api.region not in self.adapters:
+                self.adapters[api.region] = create_adapter(self.workers, retries, backoff_factor)
+
+            rate_limiter = RateLimiter.shared(api.username, api.region, rate_limits) if rate_limits else None
+
+            api.create_session(user_agent, timeout, rate_limiter=rate_limiter, metrics=metrics,
+                               adapter=self.adapters[api.region])
+
+        for username, api in self.apis.items():
+            self.runners[username] = BatchRunner(api)
+
+    def close(self):
+        for adapter in self.adapters.values():
+            adapter.close()
+
+        self.adapters = {}
+
+    def run_account(self, username: str, call: tuple) -> Response:
+        with self.semaphores[username]:
+            return self.runners[username].run(call)
+
+    def run_calls(self, calls: dict) -> Response:
+        queues = [[(username, call) for call in account_calls] for username, account_calls in calls.items()]
+        jobs = [job for jobs in itertools.zip_longest(*queues) for job in jobs if job]
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            results = list(executor.map(lambda job: self.run_account(*job), jobs))
+
+        data = {username: [] for username in calls}
+
+        for (username, _), result in zip(jobs, results):
+            data[username].append(result.to_dict())
+
+        return Response(
+            error=any(result.error for result in results),
+            data=data
+        )
+
+    def fan_out(self, call: tuple, usernames: list = None) -> Response:
+        result = self.run_calls({username: [call] for username in usernames or self.apis})
+
+        return Response(
+            error=result.error,
+            data={username: results[0] for username, results in result.data.items()}
+        )
+
+    def list_consoles(self, usernames: list = None) -> Response:
+        return self.fan_out(('list_consoles',), usernames)
+
+    def reload_apps(self, app_names: dict = None) -> Response:
+        app_names = app_names or {username: [username] for username in self.apis}
+
+        return self.run_calls({
+            username: [('reload_app', app_name) for app_name in names] for username, names in app_names.items()
+        })
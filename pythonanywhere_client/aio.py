@@ -0,0 +1,433 @@
+import asyncio
+import functools
+import time
+
+import httpx
+
+from pythonanywhere_client.cache import ResponseCache
+from pythonanywhere_client.console import POLL_INTERVAL, CommandMarker, ConsoleTail
+from pythonanywhere_client.endpoints import Call, create_call, parse_response
+from pythonanywhere_client.files import (
+    DEFAULT_CHUNK_SIZE, MultipartUpload, aiter_response, content_length, open_destination
+)
+from pythonanywhere_client.metrics import Metrics, response_size
+from pythonanywhere_client.ratelimit import RateLimiter
+from pythonanywhere_client.response import Response
+from pythonanywhere_client.transport import IDEMPOTENT_METHODS, RETRY_STATUSES, backoff_delay
+from pythonanywhere_client.tree import TreeWalk
+
+
+async def atail_console(api, console_id: int, **kwargs):
+    tail = ConsoleTail(**kwargs)
+
+    while not tail.expired():
+        output = tail.feed(await api.console_latest_output(console_id))
+
+        if output:
+            yield output
+
+        if tail.error:
+            yield tail.error
+            return
+
+        await asyncio.sleep(tail.sleep_time())
+
+
+async def arun_command(api, console_id: int, command: str, timeout: float = 60,
+                       min_interval: float = POLL_INTERVAL, max_interval: float = 5) -> Response:
+    marker = CommandMarker(command)
+    tail = ConsoleTail(from_start=False, timeout=timeout, min_interval=min_interval, max_interval=max_interval)
+
+    baseline = await api.console_latest_output(console_id)
+
+    if baseline.error:
+        return baseline
+
+    tail.feed(baseline)
+
+    sent = await api.console_input(console_id, marker.input)
+
+    if sent.error:
+        return sent
+
+    while not tail.expired():
+        await asyncio.sleep(tail.sleep_time())
+
+        output = tail.feed(await api.console_latest_output(console_id))
+
+        if output:
+            marker.feed(output)
+
+        if marker.result:
+            return marker.response()
+
+        if tail.error:
+            return tail.error
+
+    return marker.timeout()
+
+
+class AsyncRemoteWalk(TreeWalk):
+    def __init__(self, api, root: str, **kwargs):
+        super().__init__(root, **kwargs)
+        self.api = api
+
+    async def fetch(self, directory: str):
+        response = await self.api.get_dir(directory)
+
+        if self.truncated(response):
+            return await self.api.list_dir(directory)
+
+        return response
+
+    async def __aiter__(self):
+        running = {}
+
+        try:
+            while self.pending or running:
+                while self.pending and len(running) < self.workers:
+                    directory = self.pending.pop()
+                    running[asyncio.ensure_future(self.fetch(directory))] = directory
+
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+
+                for task in done:
+                    for path in self.expand(running.pop(task), task.result()):
+                        yield path
+        finally:
+            for task in running:
+                task.cancel()
+
+
+class AsyncPythonAnywhereApi:
+    def __init__(self, username, token, region='us', cache: ResponseCache = None):
+        self.username = username
+        self.token = token
+        self.region = region
+        self.cache = cache
+
+        self.session = None
+        self.retries = 3
+        self.backoff_factor = 0.5
+        self.rate_limiter = None
+        self.metrics = None
+
+        self.middlewares = []
+        self.handler = self.send
+
+        if self.region == 'us':
+            self.base_url = f'https://www.pythonanywhere.com/api/v0/user/{self.username}'
+        elif self.region == 'eu':
+            self.base_url = f'https://eu.pythonanywhere.com/api/v0/user/{self.username}'
+        else:
+            raise Exception('Invalid region provided')
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
+
+    def create_url(self, uri: str) -> str:
+        return f'{self.base_url}{uri}'
+
+    def create_session(self, user_agent: str, timeout=10, max_connections: int = 100,
+                       max_keepalive_connections: int = 20, retries: int = 3, backoff_factor: float = 0.5,
+                       rate_limiter: RateLimiter = None, metrics: Metrics = None):
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.rate_limiter = rate_limiter
+        self.metrics = metrics
+
+        if isinstance(timeout, tuple):
+            timeout = httpx.Timeout(timeout[1], connect=timeout[0])
+
+        self.session = httpx.AsyncClient(
+            headers={
+                'User-Agent': user_agent,
+                'Authorization': f'Token {self.token}'
+            },
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections
+            )
+        )
+
+    def rate_limit_wait(self, family: str) -> float:
+        if not self.rate_limiter:
+            return 0
+
+        return self.rate_limiter.wait_time(family)
+
+    async def _throttle(self, url: str):
+        if self.rate_limiter:
+            delay = self.rate_limiter.reserve(url)
+
+            if delay:
+                await asyncio.sleep(delay)
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.aclose()
+            self.session = None
+
+    def add_middleware(self, middleware):
+        self.middlewares.append(middleware)
+        self.handler = functools.partial(middleware, handler=self.handler)
+
+    async def send(self, call: Call) -> Response:
+        stream = call.endpoint.body == 'raw'
+        retries = self.retries if call.endpoint.method in IDEMPOTENT_METHODS else 0
+        attempt = 0
+        started = time.perf_counter()
+
+        while True:
+            await self._throttle(call.url)
+
+            try:
+                request = self.session.build_request(call.endpoint.method, call.url, **call.kwargs)
+                response = await self.session.send(request, stream=stream)
+            except httpx.TransportError as exception:
+                if attempt >= retries:
+                    self._record(call, started, attempt, exception=type(exception).__name__)
+
+                    return Response(
+                        status_code=None,
+                        error=True,
+                        exception=exception
+                    )
+
+                await asyncio.sleep(backoff_delay(attempt, self.backoff_factor))
+            except httpx.HTTPError as exception:
+                self._record(call, started, attempt, exception=type(exception).__name__)
+
+                return Response(
+                    status_code=None,
+                    error=True,
+                    exception=exception
+                )
+            else:
+                if response.status_code not in RETRY_STATUSES or attempt >= retries:
+                    break
+
+                await response.aclose()
+                await asyncio.sleep(backoff_delay(attempt, self.backoff_factor, response.headers.get('Retry-After')))
+
+            attempt += 1
+
+        if stream and response.status_code not in call.endpoint.success:
+            try:
+                await response.aread()
+            finally:
+                await response.aclose()
+
+        self._record(call, started, attempt, response.status_code, response_size(response, stream))
+
+        return parse_response(call.endpoint, response)
+
+    def _record(self, call: Call, started: float, retries: int, status_code: int = None, size: int = 0,
+                exception: str = None):
+        if self.metrics is not None:
+            self.metrics.record(call.endpoint.name, self.region, time.perf_counter() - started, status_code, size,
+                                retries, exception)
+
+    async def request(self, name: str, fields: dict = None, cached: bool = True, **kwargs) -> Response:
+        call = create_call(self.base_url, name, fields, **kwargs)
+
+        if self.cache is None:
+            return await self.handler(call)
+
+        response = self.cache.lookup(call) if cached else None
+
+        if response is None:
+            generation = self.cache.generation(call)
+            response = await self.handler(call)
+            self.cache.update(call, response, generation)
+
+        return response
+
+    async def create_console(self, executable: str = 'bash', arguments: str = None,
+                             working_directory: str = None) -> Response:
+        data = {'executable': executable}
+
+        if arguments:
+            data['arguments'] = arguments
+
+        if working_directory:
+            data['working_directory'] = working_directory
+
+        return await self.request('create_console', data=data)
+
+    async def delete_console(self, console_id: int) -> Response:
+        return await self.request('delete_console', {'console_id': console_id})
+
+    async def list_consoles(self) -> Response:
+        return await self.request('list_consoles')
+
+    async def console_latest_output(self, console_id: int) -> Response:
+        return await self.request('console_latest_output', {'console_id': console_id})
+
+    def tail_console(self, console_id: int, from_start: bool = True, timeout: float = None,
+                     min_interval: float = POLL_INTERVAL, max_interval: float = 10, backoff: float = 1.5):
+        return atail_console(self, console_id, from_start=from_start, timeout=timeout, min_interval=min_interval,
+                             max_interval=max_interval, backoff=backoff)
+
+    async def run_command(self, console_id: int, command: str, timeout: float = 60,
+                          min_interval: float = POLL_INTERVAL, max_interval: float = 5) -> Response:
+        return await arun_command(self, console_id, command, timeout, min_interval, max_interval)
+
+    async def console_input(self, console_id: int, input_string: str) -> Response:
+        return await self.request('console_input', {'console_id': console_id}, data={'input': input_string})
+
+    async def get_file(self, path: str) -> Response:
+        return await self.request('get_file', {'path': path})
+
+    async def stream_file(self, path: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Response:
+        stream = await self.request('stream_file', {'path': path})
+
+        if stream.error:
+            return stream
+
+        response = stream.data['response']
+
+        return Response(
+            status_code=stream.status_code,
+            error=False,
+            data={
+                'chunks': aiter_response(response, chunk_size),
+                'size': content_length(response)
+            }
+        )
+
+    async def download_file(self, path: str, destination, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Response:
+        stream = await self.stream_file(path, chunk_size)
+
+        if stream.error:
+            return stream
+
+        size = 0
+
+        try:
+            with open_destination(destination) as file:
+                async for chunk in stream.data['chunks']:
+                    await asyncio.to_thread(file.write, chunk)
+                    size += len(chunk)
+        except (httpx.HTTPError, OSError) as exception:
+            return Response(
+                status_code=None,
+                error=True,
+                exception=exception
+            )
+
+        return Response(
+            status_code=stream.status_code,
+            error=False,
+            data={'path': path, 'size': size}
+        )
+
+    async def create_file(self, path: str, content, chunk_size: int = DEFAULT_CHUNK_SIZE, progress=None) -> Response:
+        try:
+            body = MultipartUpload(content, chunk_size, progress)
+        except OSError as exception:
+            return Response(
+                status_code=None,
+                error=True,
+                exception=exception
+            )
+
+        return await self.request('create_file', {'path': path}, content=aiter(body), headers=body.headers)
+
+    async def delete_file(self, path) -> Response:
+        return await self.request('delete_file', {'path': path})
+
+    async def can_create_tasks(self) -> Response:
+        return await self.request('can_create_tasks')
+
+    async def get_dir(self, path: str) -> Response:
+        return await self.request('get_dir', {'path': path})
+
+    async def list_dir(self, path: str) -> Response:
+        return await self.request('list_dir', {'path': path})
+
+    def walk_remote(self, root: str, include: tuple = (), exclude: tuple = (), max_depth: int = None,
+                    workers: int = 8) -> AsyncRemoteWalk:
+        return AsyncRemoteWalk(self, root, include=include, exclude=exclude, max_depth=max_depth, workers=workers)
+
+    async def delete_task(self, task_id: int) -> Response:
+        return await self.request('delete_task', {'task_id': task_id})
+
+    async def create_task(self, command: str, description: str, hour: int, minute: int, enabled: bool = True,
+                          interval: str = 'daily') -> Response:
+        data = {
+            'command': command,
+            'description': description,
+            'hour': hour,
+            'minute': minute,
+            'enabled': enabled,
+            'interval': interval
+        }
+
+        return await self.request('create_task', data=data)
+
+    async def update_task(self, task_id: int, command: str = None, description: str = None, hour: int = None,
+                          minute: int = None, enabled: bool = None, interval: str = None) -> Response:
+        data = {
+            'command': command,
+            'description': description,
+            'hour': hour,
+            'minute': minute,
+            'enabled': enabled,
+            'interval': interval
+        }
+
+        data = {key: value for key, value in data.items() if value is not None}
+
+        return await self.request('update_task', {'task_id': task_id}, data=data)
+
+    async def get_tasks(self) -> Response:
+        return await self.request('get_tasks')
+
+    async def reload_app(self, app_name: str) -> Response:
+        return await self.request('reload_app', {'app_name': app_name})
+
+    async def enable_app(self, app_name: str) -> Response:
+        return await self.request('enable_app', {'app_name': app_name})
+
+    async def disable_app(self, app_name: str) -> Response:
+        return await self.request('disable_app', {'app_name': app_name})
+
+    async def get_static_headers(self, app_name: str) -> Response:
+        return await self.request('get_static_headers', {'app_name': app_name})
+
+    async def create_static_header(self, app_name: str, header_url: str, name: str, value: str) -> Response:
+        data = {
+            'url': header_url,
+            'name': name,
+            'value': value,
+        }
+
+        return await self.request('create_static_header', {'app_name': app_name}, data=data)
+
+    async def delete_static_header(self, app_name: str, header_id: int) -> Response:
+        return await self.request('delete_static_header', {'app_name': app_name, 'header_id': header_id})
+
+    async def get_static_header(self, app_name: str, header_id: int) -> Response:
+        return await self.request('get_static_header', {'app_name': app_name, 'header_id': header_id})
+
+    async def get_static_paths(self, app_name: str) -> Response:
+        return await self.request('get_static_paths', {'app_name': app_name})
+
+    async def create_static_path(self, app_name: str, static_path_url: str, path: str) -> Response:
+        data = {
+            'url': static_path_url,
+            'path': path,
+        }
+
+        return await self.request('create_static_path', {'app_name': app_name}, data=data)
+
+    async def delete_static_path(self, app_name: str, static_path_id: int) -> Response:
+        return await self.request('delete_static_path', {'app_name': app_name, 'static_path_id': static_path_id})
+
+    async def get_static_path(self, app_name: str, static_path_id: int) -> Response:
+        return await self.request('get_static_path', {'app_name': app_name, 'static_path_id': static_path_id})
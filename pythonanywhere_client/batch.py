@@ -0,0 +1,52 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from pythonanywhere_client.response import Response
+
+
+class BatchRunner:
+    def __init__(self, api):
+        self.api = api
+        self.local = threading.local()
+
+    def worker_api(self):
+        api = getattr(self.local, 'api', None)
+
+        if api is None:
+            api = self.local.api = self.api.clone()
+
+        return api
+
+    def run(self, call: tuple) -> Response:
+        name, *args = call
+
+        try:
+            return getattr(self.worker_api(), name)(*args)
+        except Exception as exception:
+            return Response(
+                status_code=None,
+                error=True,
+                exception=exception
+            )
+
+
+def iter_batch(api, calls: list, workers: int = 8):
+    runner = BatchRunner(api)
+    executor = ThreadPoolExecutor(max_workers=workers)
+
+    try:
+        futures = {executor.submit(runner.run, call): index for index, call in enumerate(calls)}
+
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+    finally:
+        executor.shutdown(cancel_futures=True)
+
+
+def map_batch(api, calls: list, workers: int = 8) -> list:
+    results = [None] * len(calls)
+
+    for index, response in iter_batch(api, calls, workers):
+        results[index] = response
+
+    return results
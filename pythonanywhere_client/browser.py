@@ -0,0 +1,104 @@
+import contextlib
+import queue
+import threading
+
+
+def driver_healthy(driver) -> bool:
+    try:
+        return driver.execute_script('return 1') == 1
+    except Exception:
+        return False
+
+
+def quit_driver(driver):
+    try:
+        driver.quit()
+    except Exception:
+        pass
+
+
+class DriverPool:
+    def __init__(self, factory, size: int = 2, max_uses: int = 50, check=driver_healthy):
+        self.factory = factory
+        self.size = size
+        self.max_uses = max_uses
+        self.check = check
+
+        self.idle = queue.LifoQueue()
+        self.uses = {}
+        self.created = 0
+        self.closed = False
+        self.lock = threading.Lock()
+
+    def acquire(self, timeout: float = None):
+        while True:
+            if self.closed:
+                raise RuntimeError('DriverPool is closed')
+
+            try:
+                driver = self.idle.get_nowait()
+            except queue.Empty:
+                driver = self._create() or self.idle.get(timeout=timeout)
+
+            if self.check(driver):
+                return driver
+
+            self._discard(driver)
+
+    def release(self, driver, healthy: bool = True):
+        with self.lock:
+            self.uses[id(driver)] = self.uses.get(id(driver), 0) + 1
+            recycle = self.closed or not healthy or self.uses[id(driver)] >= self.max_uses
+
+            if not recycle:
+                self.idle.put(driver)
+
+        if recycle:
+            self._discard(driver)
+
+    @contextlib.contextmanager
+    def driver(self, timeout: float = None):
+        driver = self.acquire(timeout)
+        healthy = False
+
+        try:
+            yield driver
+            healthy = True
+        finally:
+            self.release(driver, healthy)
+
+    def warm(self):
+        while driver := self._create():
+            self.idle.put(driver)
+
+    def close(self):
+        with self.lock:
+            self.closed = True
+
+        while True:
+            try:
+                self._discard(self.idle.get_nowait())
+            except queue.Empty:
+                break
+
+    def _create(self):
+        with self.lock:
+            if self.closed or self.created >= self.size:
+                return None
+
+            self.created += 1
+
+        try:
+            return self.factory()
+        except Exception:
+            with self.lock:
+                self.created -= 1
+
+            raise
+
+    def _discard(self, driver):
+        quit_driver(driver)
+
+        with self.lock:
+            self.uses.pop(id(driver), None)
+            self.created -= 1
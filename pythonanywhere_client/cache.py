@@ -0,0 +1,114 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from pythonanywhere_client.response import Response
+
+DEFAULT_TTLS = {
+    'list_consoles': 5,
+    'can_create_tasks': 300,
+    'get_dir': 10,
+    'get_tasks': 30,
+    'get_static_headers': 60,
+    'get_static_header': 60,
+    'get_static_paths': 60,
+    'get_static_path': 60,
+}
+
+
+class ResponseCache:
+    def __init__(self, ttls: dict = None, max_bytes: int = 16 * 1024 * 1024):
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.size = 0
+        self.generations = {}
+        self.epoch = 0
+        self.lock = threading.Lock()
+
+    def ttl(self, endpoint: str) -> float:
+        return self.ttls.get(endpoint, 0)
+
+    def get(self, key: tuple):
+        with self.lock:
+            entry = self.entries.get(key)
+
+            if entry is None:
+                return None
+
+            expires, size, response = entry
+
+            if expires < time.monotonic():
+                self._remove(key)
+                return None
+
+            self.entries.move_to_end(key)
+
+        return Response(
+            status_code=response.status_code,
+            error=response.error,
+            data=copy.deepcopy(response.data)
+        )
+
+    def set(self, key: tuple, response: Response):
+        size = len(repr(response.data))
+
+        if size > self.max_bytes:
+            return
+
+        with self.lock:
+            if key in self.entries:
+                self._remove(key)
+
+            self.entries[key] = (time.monotonic() + self.ttl(key[0]), size, copy.deepcopy(response))
+            self.size += size
+
+            while self.size > self.max_bytes:
+                self._remove(next(iter(self.entries)))
+
+    def invalidate(self, endpoint: str, base_url: str = None, scope=None):
+        with self.lock:
+            generation = (endpoint, base_url) if scope is None else (endpoint, base_url, scope)
+            self.generations[generation] = self.generations.get(generation, 0) + 1
+
+            for key in [
+                key for key in self.entries
+                if key[0] == endpoint and base_url in (None, key[1]) and (scope is None or key[2][:1] == scope)
+            ]:
+                self._remove(key)
+
+    def generation(self, call) -> tuple:
+        name, base_url, fields = call.key
+        keys = [(name, url) for url in (None, base_url)]
+
+        with self.lock:
+            return (
+                self.epoch,
+                *(self.generations.get(key, 0) for key in keys),
+                *(self.generations.get((*key, fields[:1]), 0) for key in keys),
+            )
+
+    def lookup(self, call):
+        if not self.ttl(call.endpoint.name):
+            return None
+
+        return self.get(call.key)
+
+    def update(self, call, response: Response, generation: tuple = None):
+        if self.ttl(call.endpoint.name) and not response.error:
+            if generation is None or generation == self.generation(call):
+                self.set(call.key, response)
+
+        for endpoint in call.endpoint.invalidates:
+            self.invalidate(endpoint, call.base_url, call.key[2][:1] if call.endpoint.scoped else None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+            self.epoch += 1
+
+    def _remove(self, key: tuple):
+        _, size, _ = self.entries.pop(key)
+        self.size -= size
@@ -0,0 +1,178 @@
+import os
+import re
+import time
+
+from pythonanywhere_client.ratelimit import DEFAULT_LIMITS
+from pythonanywhere_client.response import Response
+
+TERMINAL_STATUSES = frozenset({401, 403, 404})
+POLL_INTERVAL = DEFAULT_LIMITS['consoles'][1] / DEFAULT_LIMITS['consoles'][0]
+
+
+def overlap(previous: str, current: str) -> int:
+    text = f'{current[:len(previous)]}\0{previous}'
+    prefix = [0] * len(text)
+
+    for index in range(1, len(text)):
+        size = prefix[index - 1]
+
+        while size and text[index] != text[size]:
+            size = prefix[size - 1]
+
+        if text[index] == text[size]:
+            size += 1
+
+        prefix[index] = size
+
+    return prefix[-1] if text else 0
+
+
+def new_output(previous: str, current: str) -> str:
+    if current.startswith(previous):
+        return current[len(previous):]
+
+    return current[overlap(previous, current):]
+
+
+class PollInterval:
+    def __init__(self, min_interval: float = POLL_INTERVAL, max_interval: float = 10, backoff: float = 1.5):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.current = min_interval
+
+    def update(self, active: bool) -> float:
+        if active:
+            self.current = self.min_interval
+        else:
+            self.current = min(self.current * self.backoff, self.max_interval)
+
+        return self.current
+
+
+class ConsoleTail:
+    def __init__(self, from_start: bool = True, timeout: float = None, min_interval: float = POLL_INTERVAL,
+                 max_interval: float = 10, backoff: float = 1.5):
+        self.buffer = ''
+        self.baseline = not from_start
+        self.deadline = time.monotonic() + timeout if timeout is not None else None
+        self.interval = PollInterval(min_interval, max_interval, backoff)
+        self.error = None
+
+    def expired(self) -> bool:
+        return self.deadline is not None and time.monotonic() >= self.deadline
+
+    def feed(self, response):
+        if response.error:
+            if response.status_code in TERMINAL_STATUSES:
+                self.error = response
+
+            self.interval.update(False)
+            return None
+
+        current = (response.data or {}).get('output', '')
+
+        if self.baseline:
+            self.baseline = False
+            self.buffer = current
+            self.interval.update(False)
+            return None
+
+        output = new_output(self.buffer, current)
+        self.buffer = current
+        self.interval.update(bool(output))
+
+        return output or None
+
+    def sleep_time(self) -> float:
+        if self.deadline is None:
+            return self.interval.current
+
+        return max(min(self.interval.current, self.deadline - time.monotonic()), 0)
+
+
+class CommandMarker:
+    def __init__(self, command: str):
+        token = os.urandom(16).hex()
+
+        self.input = f"{{ printf '__PA_START_%s__\\n' {token}\n{command}\n}}; printf '__PA_END_%s_%s__\\n' {token} $?\n"
+        self.pattern = re.compile(rf'__PA_START_{token}__\r?\n(.*?)__PA_END_{token}_(\d+)__', re.S)
+        self.text = ''
+        self.result = None
+
+    def feed(self, output: str):
+        self.text += output
+        self.result = self.pattern.search(self.text)
+
+    def response(self) -> Response:
+        return Response(
+            error=False,
+            data={
+                'output': self.result.group(1).replace('\r\n', '\n'),
+                'exit_code': int(self.result.group(2))
+            }
+        )
+
+    def timeout(self) -> Response:
+        return Response(
+            status_code=None,
+            error=True,
+            data={'message': 'Timed out waiting for command to finish', 'output': self.text}
+        )
+
+
+def follow_console(api, console_id: int, tail: ConsoleTail):
+    while not tail.expired():
+        output = tail.feed(api.console_latest_output(console_id))
+
+        if output:
+            yield output
+
+        if tail.error:
+            yield tail.error
+            return
+
+        time.sleep(tail.sleep_time())
+
+
+def tail_console(api, console_id: int, **kwargs):
+    tail = ConsoleTail(**kwargs)
+
+    if tail.baseline:
+        tail.feed(api.console_latest_output(console_id))
+
+    return follow_console(api, console_id, tail)
+
+
+def run_command(api, console_id: int, command: str, timeout: float = 60, min_interval: float = POLL_INTERVAL,
+                max_interval: float = 5) -> Response:
+    marker = CommandMarker(command)
+    tail = ConsoleTail(from_start=False, timeout=timeout, min_interval=min_interval, max_interval=max_interval)
+
+    baseline = api.console_latest_output(console_id)
+
+    if baseline.error:
+        return baseline
+
+    tail.feed(baseline)
+
+    sent = api.console_input(console_id, marker.input)
+
+    if sent.error:
+        return sent
+
+    while not tail.expired():
+        time.sleep(tail.sleep_time())
+
+        output = tail.feed(api.console_latest_output(console_id))
+
+        if output:
+            marker.feed(output)
+
+        if marker.result:
+            return marker.response()
+
+        if tail.error:
+            return tail.error
+
+    return marker.timeout()
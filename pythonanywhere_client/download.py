@@ -0,0 +1,277 @@
+import os
+import tarfile
+import tempfile
+import threading
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+from pythonanywhere_client.batch import BatchRunner
+from pythonanywhere_client.files import DEFAULT_CHUNK_SIZE, decoded_length, iter_response
+from pythonanywhere_client.response import Response
+
+TAR_MODES = {
+    '.tar': 'w',
+    '.tar.gz': 'w:gz',
+    '.tgz': 'w:gz',
+    '.tar.bz2': 'w:bz2',
+    '.tar.xz': 'w:xz',
+}
+
+
+class ChunkReader:
+    def __init__(self, chunks):
+        self.chunks = iter(chunks)
+        self.buffer = b''
+
+    def read(self, size: int = -1) -> bytes:
+        while size < 0 or len(self.buffer) < size:
+            chunk = next(self.chunks, None)
+
+            if chunk is None:
+                break
+
+            self.buffer += chunk
+
+        if size < 0:
+            size = len(self.buffer)
+
+        data, self.buffer = self.buffer[:size], self.buffer[size:]
+
+        return data
+
+
+class DirectoryWriter:
+    resumable = True
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def target(self, name: str) -> str:
+        return os.path.join(self.root, *name.split('/'))
+
+    def existing_size(self, name: str):
+        try:
+            return os.path.getsize(self.target(name))
+        except OSError:
+            return None
+
+    def add_directory(self, name: str):
+        os.makedirs(self.target(name), exist_ok=True)
+
+    def add_file(self, name: str, chunks, size: int = None) -> int:
+        target = self.target(name)
+        temporary = f'{target}.part'
+        written = 0
+
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+
+        with open(temporary, 'wb') as file:
+            for chunk in chunks:
+                file.write(chunk)
+                written += len(chunk)
+
+        os.replace(temporary, target)
+
+        return written
+
+    def close(self):
+        pass
+
+
+class TarWriter:
+    resumable = False
+
+    def __init__(self, destination, mode: str = 'w'):
+        if isinstance(destination, (str, os.PathLike)):
+            self.archive = tarfile.open(destination, mode)
+        else:
+            self.archive = tarfile.open(fileobj=destination, mode=mode.replace(':', '|') if ':' in mode else f'{mode}|')
+
+    def add_directory(self, name: str):
+        info = tarfile.TarInfo(name)
+        info.type = tarfile.DIRTYPE
+        info.mode = 0o755
+        info.mtime = int(time.time())
+        self.archive.addfile(info)
+
+    def add_file(self, name: str, chunks, size: int = None) -> int:
+        spool = None
+
+        if size is None:
+            spool = tempfile.TemporaryFile()
+
+            for chunk in chunks:
+                spool.write(chunk)
+
+            size = spool.tell()
+            spool.seek(0)
+
+        info = tarfile.TarInfo(name)
+        info.size = size
+        info.mode = 0o644
+        info.mtime = int(time.time())
+
+        reader = spool or ChunkReader(chunks)
+
+        try:
+            self.archive.addfile(info, reader)
+
+            if reader.read(1):
+                raise OSError(f'{name} is larger than {size} bytes')
+        finally:
+            if spool:
+                spool.close()
+
+        return size
+
+    def close(self):
+        self.archive.close()
+
+
+class ZipWriter:
+    resumable = False
+
+    def __init__(self, destination):
+        self.archive = zipfile.ZipFile(destination, 'w', zipfile.ZIP_DEFLATED)
+
+    def add_directory(self, name: str):
+        self.archive.writestr(f'{name}/', b'')
+
+    def add_file(self, name: str, chunks, size: int = None) -> int:
+        written = 0
+
+        with self.archive.open(name, 'w', force_zip64=True) as file:
+            for chunk in chunks:
+                file.write(chunk)
+                written += len(chunk)
+
+        return written
+
+    def close(self):
+        self.archive.close()
+
+
+def create_writer(destination, archive: str = None):
+    name = str(destination) if isinstance(destination, (str, os.PathLike)) else ''
+    archive = archive or next((suffix for suffix in (*TAR_MODES, '.zip') if name.endswith(suffix)), None)
+
+    if archive == '.zip' or archive == 'zip':
+        return ZipWriter(destination)
+
+    if archive or not name:
+        return TarWriter(destination, TAR_MODES.get(archive, TAR_MODES.get(f'.{archive}', 'w')))
+
+    return DirectoryWriter(name)
+
+
+class TreeDownload:
+    def __init__(self, api, remote_root: str, writer, workers: int = 8, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 resume: bool = True):
+        self.api = api
+        self.remote_root = remote_root.rstrip('/') + '/'
+        self.writer = writer
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.resume = resume and writer.resumable
+
+        self.runner = BatchRunner(api)
+        self.lock = threading.Lock()
+        self.broken = None
+
+    def download(self, path: str) -> Response:
+        name = path[len(self.remote_root):]
+        stream = self.runner.worker_api().request(
+            'stream_file', {'path': path}, stream=True, headers={'Accept-Encoding': 'identity'}
+        )
+
+        if stream.error:
+            return stream
+
+        response = stream.data['response']
+        size = decoded_length(response)
+
+        if self.resume and size is not None and self.writer.existing_size(name) == size:
+            response.close()
+
+            return Response(status_code=response.status_code, data={'skipped': True, 'size': size})
+
+        chunks = iter_response(response, self.chunk_size)
+
+        try:
+            if self.writer.resumable:
+                written = self.writer.add_file(name, chunks, size)
+            else:
+                written = self.append(name, chunks)
+        except Exception as exception:
+            response.close()
+
+            return Response(
+                status_code=None,
+                error=True,
+                exception=exception
+            )
+
+        return Response(status_code=response.status_code, data={'skipped': False, 'size': written})
+
+    def append(self, name: str, chunks) -> int:
+        with tempfile.SpooledTemporaryFile(max_size=self.chunk_size) as spool:
+            for chunk in chunks:
+                spool.write(chunk)
+
+            size = spool.tell()
+            spool.seek(0)
+
+            with self.lock:
+                if self.broken:
+                    raise OSError(f'archive is incomplete after a failed write: {self.broken}')
+
+                try:
+                    return self.writer.add_file(name, iter(lambda: spool.read(self.chunk_size), b''), size)
+                except Exception as exception:
+                    self.broken = repr(exception)
+                    raise
+
+    def run(self, include: tuple = (), exclude: tuple = ()) -> Response:
+        walk = self.api.walk_remote(self.remote_root, include=include, exclude=exclude, workers=self.workers)
+        files = {}
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                for path in walk:
+                    if path.endswith('/'):
+                        with self.lock:
+                            self.writer.add_directory(path[len(self.remote_root):].rstrip('/'))
+                    else:
+                        files[path] = executor.submit(self.download, path)
+        finally:
+            self.writer.close()
+
+        failed = {path: response.to_dict() for path, response in walk.failed.items()}
+        downloaded = []
+        skipped = []
+        size = 0
+
+        for path, future in files.items():
+            response = future.result()
+
+            if response.error:
+                failed[path] = response.to_dict()
+            elif response.data['skipped']:
+                skipped.append(path)
+            else:
+                downloaded.append(path)
+                size += response.data['size']
+
+        return Response(
+            error=bool(failed),
+            data={'downloaded': downloaded, 'skipped': skipped, 'bytes': size, 'failed': failed}
+        )
+
+
+def download_tree(api, remote_root: str, destination, archive: str = None, workers: int = 8,
+                  chunk_size: int = DEFAULT_CHUNK_SIZE, resume: bool = True, include: tuple = (),
+                  exclude: tuple = ()) -> Response:
+    writer = create_writer(destination, archive)
+
+    return TreeDownload(api, remote_root, writer, workers, chunk_size, resume).run(include, exclude)
@@ -0,0 +1,114 @@
+import base64
+from dataclasses import dataclass, field
+
+from pythonanywhere_client.response import Response, response_data
+
+
+@dataclass(frozen=True)
+class Endpoint:
+    name: str
+    method: str
+    uri: str
+    success: tuple = (200,)
+    body: str = 'json'
+    query: tuple = ()
+    invalidates: tuple = ()
+    scoped: bool = False
+
+
+@dataclass
+class Call:
+    endpoint: Endpoint
+    fields: dict
+    url: str
+    kwargs: dict = field(default_factory=dict)
+    base_url: str = ''
+
+    @property
+    def key(self) -> tuple:
+        return self.endpoint.name, self.base_url, tuple(self.fields.values())
+
+
+ENDPOINTS = {endpoint.name: endpoint for endpoint in (
+    Endpoint('create_console', 'POST', '/consoles/', (201,), invalidates=('list_consoles',)),
+    Endpoint('delete_console', 'DELETE', '/consoles/{console_id}/', (204,), invalidates=('list_consoles',)),
+    Endpoint('list_consoles', 'GET', '/consoles/'),
+    Endpoint('console_latest_output', 'GET', '/consoles/{console_id}/get_latest_output/'),
+    Endpoint('console_input', 'POST', '/consoles/{console_id}/send_input/'),
+
+    Endpoint('get_file', 'GET', '/files/path{path}', body='base64'),
+    Endpoint('stream_file', 'GET', '/files/path{path}', body='raw'),
+    Endpoint('create_file', 'POST', '/files/path{path}', (200, 201), invalidates=('get_dir',)),
+    Endpoint('delete_file', 'DELETE', '/files/path{path}', (204,), invalidates=('get_dir',)),
+    Endpoint('get_dir', 'GET', '/files/tree/', query=('path',)),
+    Endpoint('list_dir', 'GET', '/files/path{path}'),
+
+    Endpoint('can_create_tasks', 'GET', '/user_perms/schedule/'),
+    Endpoint('get_tasks', 'GET', '/schedule/'),
+    Endpoint('create_task', 'POST', '/schedule/', (201,), invalidates=('get_tasks',)),
+    Endpoint('delete_task', 'DELETE', '/schedule/{task_id}/', (204,), body='empty', invalidates=('get_tasks',)),
+    Endpoint('update_task', 'PATCH', '/schedule/{task_id}/', invalidates=('get_tasks',)),
+
+    Endpoint('reload_app', 'POST', '/webapps/{app_name}.pythonanywhere.com/reload/', body='status'),
+    Endpoint('enable_app', 'POST', '/webapps/{app_name}.pythonanywhere.com/enable/', body='status'),
+    Endpoint('disable_app', 'POST', '/webapps/{app_name}.pythonanywhere.com/disable/', body='status'),
+
+    Endpoint('get_static_headers', 'GET', '/webapps/{app_name}.pythonanywhere.com/static_headers/'),
+    Endpoint('get_static_header', 'GET', '/webapps/{app_name}.pythonanywhere.com/static_headers/{header_id}/'),
+    Endpoint('create_static_header', 'POST', '/webapps/{app_name}.pythonanywhere.com/static_headers/', (201,),
+             invalidates=('get_static_headers', 'get_static_header'), scoped=True),
+    Endpoint('delete_static_header', 'DELETE', '/webapps/{app_name}.pythonanywhere.com/static_headers/{header_id}/',
+             (204,), invalidates=('get_static_headers', 'get_static_header'), scoped=True),
+
+    Endpoint('get_static_paths', 'GET', '/webapps/{app_name}.pythonanywhere.com/static_files/'),
+    Endpoint('get_static_path', 'GET', '/webapps/{app_name}.pythonanywhere.com/static_files/{static_path_id}/'),
+    Endpoint('create_static_path', 'POST', '/webapps/{app_name}.pythonanywhere.com/static_files/', (201,),
+             invalidates=('get_static_paths', 'get_static_path'), scoped=True),
+    Endpoint('delete_static_path', 'DELETE', '/webapps/{app_name}.pythonanywhere.com/static_files/{static_path_id}/',
+             (204,), invalidates=('get_static_paths', 'get_static_path'), scoped=True),
+)}
+
+
+def create_call(base_url: str, name: str, fields: dict = None, **kwargs) -> Call:
+    endpoint = ENDPOINTS[name]
+    fields = fields or {}
+
+    if endpoint.query:
+        kwargs['params'] = {key: fields[key] for key in endpoint.query}
+
+    return Call(endpoint, fields, f'{base_url}{endpoint.uri.format(**fields)}', kwargs, base_url)
+
+
+def parse_response(endpoint: Endpoint, response) -> Response:
+    error = response.status_code not in endpoint.success
+
+    if endpoint.body == 'empty':
+        return Response(
+            status_code=response.status_code,
+            error=error
+        )
+
+    if endpoint.body == 'base64':
+        return Response(
+            status_code=response.status_code,
+            error=error,
+            data={'content': base64.b64encode(response.content).decode('ascii')}
+        )
+
+    if endpoint.body == 'raw' and not error:
+        return Response(
+            status_code=response.status_code,
+            error=False,
+            data={'response': response}
+        )
+
+    if endpoint.body != 'status':
+        return Response.from_http(response, error)
+
+    data = response_data(response)
+
+    return Response(
+        status_code=response.status_code,
+        error=error or not (isinstance(data, dict) and data.get('status') == 'OK'),
+        data=data
+    )
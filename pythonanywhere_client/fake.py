@@ -0,0 +1,676 @@
+import datetime
+import email
+import gzip
+import itertools
+import json
+import posixpath
+import random
+import re
+import secrets
+import threading
+import time
+from http.cookies import SimpleCookie
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, quote, urlsplit
+
+from pythonanywhere_client.ratelimit import TokenBucket
+from pythonanywhere_client.tree import TREE_LIMIT
+from pythonanywhere_client.webapps import EXPIRY_FORMAT
+
+API_PREFIX = '/api/v0/user/(?P<user>[^/]+)'
+DOMAIN = r'(?P<domain>[^/]+\.pythonanywhere\.com)'
+
+ROUTES = (
+    ('POST', f'{API_PREFIX}/consoles/', 'create_console'),
+    ('GET', f'{API_PREFIX}/consoles/', 'list_consoles'),
+    ('DELETE', f'{API_PREFIX}/consoles/(?P<id>\\d+)/', 'delete_console'),
+    ('GET', f'{API_PREFIX}/consoles/(?P<id>\\d+)/get_latest_output/', 'console_latest_output'),
+    ('POST', f'{API_PREFIX}/consoles/(?P<id>\\d+)/send_input/', 'console_input'),
+    ('GET', f'{API_PREFIX}/files/tree/', 'get_dir'),
+    ('GET', f'{API_PREFIX}/files/path(?P<path>/.*)', 'get_file'),
+    ('POST', f'{API_PREFIX}/files/path(?P<path>/.*)', 'create_file'),
+    ('DELETE', f'{API_PREFIX}/files/path(?P<path>/.*)', 'delete_file'),
+    ('GET', f'{API_PREFIX}/user_perms/schedule/', 'can_create_tasks'),
+    ('GET', f'{API_PREFIX}/schedule/', 'get_tasks'),
+    ('POST', f'{API_PREFIX}/schedule/', 'create_task'),
+    ('PATCH', f'{API_PREFIX}/schedule/(?P<id>\\d+)/', 'update_task'),
+    ('DELETE', f'{API_PREFIX}/schedule/(?P<id>\\d+)/', 'delete_task'),
+    ('POST', f'{API_PREFIX}/webapps/{DOMAIN}/(?P<action>reload|enable|disable)/', 'app_action'),
+    ('GET', f'{API_PREFIX}/webapps/{DOMAIN}/(?P<kind>static_headers|static_files)/', 'list_static'),
+    ('POST', f'{API_PREFIX}/webapps/{DOMAIN}/(?P<kind>static_headers|static_files)/', 'create_static'),
+    ('GET', f'{API_PREFIX}/webapps/{DOMAIN}/(?P<kind>static_headers|static_files)/(?P<id>\\d+)/', 'get_static'),
+    ('DELETE', f'{API_PREFIX}/webapps/{DOMAIN}/(?P<kind>static_headers|static_files)/(?P<id>\\d+)/', 'delete_static'),
+    ('GET', '/login/', 'login_page'),
+    ('POST', '/login/', 'login'),
+    ('POST', '/logout/', 'logout'),
+    ('GET', '/user/(?P<user>[^/]+)/webapps/', 'webapps_page'),
+    ('POST', f'/user/(?P<user>[^/]+)/webapps/{DOMAIN}/reload', 'web_reload'),
+    ('POST', f'/user/(?P<user>[^/]+)/webapps/{DOMAIN}/extend', 'web_extend'),
+    ('POST', '/user/(?P<user>[^/]+)/schedule/task/(?P<id>\\d+)/extend', 'web_extend_task'),
+)
+
+STATIC_FIELDS = {
+    'static_headers': ('url', 'name', 'value'),
+    'static_files': ('url', 'path'),
+}
+
+LOGIN_PAGE = '''<html><body>
+<form method="post" action="/login/">
+<input type="hidden" name="csrfmiddlewaretoken" value="{token}">
+{error}
+</form>
+</body></html>'''
+
+LOGIN_ERROR = '<p id="id_login_error">The user name or password is incorrect. Please try again.</p>'
+
+APP_PANE = '''<div class="tab-pane fade" id="id_{pane}">
+  <form method="post" action="/user/{user}/webapps/{domain}/reload">
+    <input type="hidden" name="csrfmiddlewaretoken" value="{token}">
+  </form>
+  <p class="webapp_expiry">This site will be disabled on <strong>{expiry}</strong></p>
+  <form method="post" action="/user/{user}/webapps/{domain}/{action}/"></form>
+</div>'''
+
+
+TASK_TYPES = {'hour': int, 'minute': int, 'enabled': lambda value: value in (True, 'True', 'true')}
+
+
+def task_form(form: dict) -> dict:
+    return {key: TASK_TYPES.get(key, str)(value) if value not in (None, '') else None for key, value in form.items()}
+
+
+class FakeState:
+    def __init__(self, username: str, password: str, token: str):
+        self.username = username
+        self.password = password
+        self.token = token
+        self.home = f'/home/{username}'
+
+        self.ids = itertools.count(1)
+        self.consoles = {}
+        self.files = {}
+        self.directories = {self.home}
+        self.tasks = {}
+        self.sessions = set()
+        self.webapps = {}
+        self.lock = threading.RLock()
+
+        self.add_webapp(f'{username}.pythonanywhere.com')
+
+    def add_webapp(self, domain: str, expiry: datetime.date = None):
+        self.webapps[domain] = {
+            'expiry': expiry or datetime.date.today() + datetime.timedelta(days=90),
+            'enabled': True,
+            'reloads': 0,
+            'static_headers': {},
+            'static_files': {},
+        }
+
+    def add_file(self, path: str, content: bytes):
+        self.files[path] = content
+        parent = posixpath.dirname(path)
+
+        while parent not in self.directories and parent != '/':
+            self.directories.add(parent)
+            parent = posixpath.dirname(parent)
+
+    def remove_path(self, path: str) -> bool:
+        path = path.rstrip('/')
+
+        if path in self.files:
+            del self.files[path]
+            return True
+
+        if path not in self.directories:
+            return False
+
+        prefix = f'{path}/'
+        self.directories = {entry for entry in self.directories if entry != path and not entry.startswith(prefix)}
+        self.files = {entry: data for entry, data in self.files.items() if not entry.startswith(prefix)}
+
+        return True
+
+    def tree(self, path: str) -> list:
+        prefix = f"{path.rstrip('/')}/"
+        entries = [f'{entry}/' for entry in self.directories if entry.startswith(prefix)]
+        entries.extend(entry for entry in self.files if entry.startswith(prefix))
+
+        return sorted(entries)[:TREE_LIMIT]
+
+    def listing(self, path: str) -> dict:
+        prefix = f"{path.rstrip('/')}/"
+        entries = {}
+
+        for entry in sorted(self.directories | set(self.files)):
+            name = entry[len(prefix):]
+
+            if entry.startswith(prefix) and '/' not in name:
+                entries[name] = {
+                    'type': 'directory' if entry in self.directories else 'file',
+                    'url': f'/api/v0/user/{self.username}/files/path{quote(entry)}',
+                }
+
+        return entries
+
+
+class FakeHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    server_version = 'FakePythonAnywhere/1.0'
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self.dispatch('GET')
+
+    def do_POST(self):
+        self.dispatch('POST')
+
+    def do_PATCH(self):
+        self.dispatch('PATCH')
+
+    def do_DELETE(self):
+        self.dispatch('DELETE')
+
+    def read_body(self) -> bytes:
+        if self.headers.get('Transfer-Encoding', '').lower() == 'chunked':
+            body = b''
+
+            while True:
+                size = int(self.rfile.readline().split(b';')[0].strip(), 16)
+
+                if not size:
+                    self.rfile.readline()
+                    return body
+
+                body += self.rfile.read(size)
+                self.rfile.readline()
+
+        return self.rfile.read(int(self.headers.get('Content-Length') or 0))
+
+    def form(self) -> dict:
+        content_type = self.headers.get('Content-Type', '')
+
+        if content_type.startswith('multipart/form-data'):
+            message = email.message_from_bytes(f'Content-Type: {content_type}\r\n\r\n'.encode() + self.body)
+
+            return {part.get_param('name', header='content-disposition'): part.get_payload(decode=True)
+                    for part in message.get_payload()}
+
+        if content_type.startswith('application/json'):
+            return json.loads(self.body or b'{}')
+
+        return {key: values[-1] for key, values in parse_qs(self.body.decode(), keep_blank_values=True).items()}
+
+    def cookies(self) -> dict:
+        cookie = SimpleCookie(self.headers.get('Cookie', ''))
+
+        return {name: morsel.value for name, morsel in cookie.items()}
+
+    def send(self, status: int, body=b'', content_type: str = 'application/json', headers: tuple = ()):
+        if not isinstance(body, bytes):
+            body = json.dumps(body).encode() if content_type == 'application/json' else body.encode()
+
+        self.send_response(status)
+
+        for name, value in headers:
+            self.send_header(name, value)
+
+        if body or status not in (204, 302):
+            self.send_header('Content-Type', content_type)
+
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+
+        if self.truncate_after is not None:
+            body = body[:self.truncate_after]
+            self.close_connection = True
+
+        if self.command != 'HEAD':
+            self.wfile.write(body)
+
+    def dispatch(self, method: str):
+        server = self.server.fake
+        url = urlsplit(self.path)
+        self.query = parse_qs(url.query)
+        self.body = self.read_body()
+        self.truncate_after = None
+
+        route = server.route(method, url.path)
+
+        if route is None:
+            return self.send(404, {'detail': 'Not found.'})
+
+        name, params = route
+        server.count(name)
+        server.wait()
+
+        failure = server.failure(name, self.headers.get('Authorization') or self.cookies().get('sessionid'))
+
+        if failure:
+            return self.send(*failure)
+
+        self.truncate_after = server.truncation(name)
+
+        if name.startswith(('login', 'logout', 'web')):
+            return getattr(self, name)(server.state, **params)
+
+        if self.headers.get('Authorization') != f'Token {server.state.token}':
+            return self.send(401, {'detail': 'Invalid token.'})
+
+        if params.pop('user') != server.state.username:
+            return self.send(403, {'detail': 'You do not have permission to perform this action.'})
+
+        with server.state.lock:
+            return getattr(self, name)(server.state, **params)
+
+    def create_console(self, state: FakeState):
+        form = self.form()
+        console = {
+            'id': next(state.ids),
+            'user': state.username,
+            'executable': form.get('executable', 'bash'),
+            'arguments': form.get('arguments', ''),
+            'working_directory': form.get('working_directory'),
+            'name': f"{form.get('executable', 'bash')} console",
+            'console_url': '',
+            'output': '',
+        }
+        state.consoles[console['id']] = console
+
+        self.send(201, {key: value for key, value in console.items() if key != 'output'})
+
+    def list_consoles(self, state: FakeState):
+        self.send(200, [{key: value for key, value in console.items() if key != 'output'}
+                        for console in state.consoles.values()])
+
+    def delete_console(self, state: FakeState, id: str):
+        if state.consoles.pop(int(id), None) is None:
+            return self.send(404, {'detail': 'Not found.'})
+
+        self.send(204)
+
+    def console_latest_output(self, state: FakeState, id: str):
+        console = state.consoles.get(int(id))
+
+        if console is None:
+            return self.send(404, {'detail': 'Not found.'})
+
+        self.send(200, {'output': console['output']})
+
+    def console_input(self, state: FakeState, id: str):
+        console = state.consoles.get(int(id))
+
+        if console is None:
+            return self.send(404, {'detail': 'Not found.'})
+
+        console['output'] += str(self.form().get('input', ''))
+        self.send(200, {'status': 'OK'})
+
+    def get_dir(self, state: FakeState):
+        path = self.query.get('path', [''])[0].rstrip('/')
+
+        if path not in state.directories:
+            return self.send(404, {'detail': f'No such directory: {path}'})
+
+        self.send(200, state.tree(path))
+
+    def get_file(self, state: FakeState, path: str):
+        if path.rstrip('/') in state.directories:
+            return self.send(200, state.listing(path))
+
+        if path not in state.files:
+            return self.send(404, {'detail': 'No such file or directory'})
+
+        if self.server.fake.compress:
+            return self.send(200, gzip.compress(state.files[path]), 'application/octet-stream',
+                             (('Content-Encoding', 'gzip'),))
+
+        self.send(200, state.files[path], 'application/octet-stream')
+
+    def create_file(self, state: FakeState, path: str):
+        content = self.form().get('content')
+
+        if content is None:
+            return self.send(400, {'detail': 'content is required'})
+
+        status = 200 if path in state.files else 201
+        state.add_file(path, content)
+
+        self.send(status)
+
+    def delete_file(self, state: FakeState, path: str):
+        if not state.remove_path(path):
+            return self.send(404, {'detail': 'No such file or directory'})
+
+        self.send(204)
+
+    def can_create_tasks(self, state: FakeState):
+        self.send(200, {'can_create_tasks': True})
+
+    def get_tasks(self, state: FakeState):
+        self.send(200, list(state.tasks.values()))
+
+    def create_task(self, state: FakeState):
+        form = task_form(self.form())
+        task = {
+            'id': next(state.ids),
+            'command': form.get('command'),
+            'description': form.get('description', ''),
+            'enabled': form.get('enabled', True) is not False,
+            'interval': form.get('interval', 'daily'),
+            'hour': form.get('hour'),
+            'minute': form.get('minute'),
+            'expiry': (datetime.date.today() + datetime.timedelta(days=30)).isoformat(),
+            'user': state.username,
+        }
+
+        if task['interval'] == 'hourly':
+            task['hour'] = None
+
+        state.tasks[task['id']] = task
+        self.send(201, task)
+
+    def update_task(self, state: FakeState, id: str):
+        task = state.tasks.get(int(id))
+
+        if task is None:
+            return self.send(404, {'detail': 'Not found.'})
+
+        task.update((key, value) for key, value in task_form(self.form()).items() if key in task and key != 'id')
+        self.send(200, task)
+
+    def delete_task(self, state: FakeState, id: str):
+        if state.tasks.pop(int(id), None) is None:
+            return self.send(404, {'detail': 'Not found.'})
+
+        self.send(204)
+
+    def app_action(self, state: FakeState, domain: str, action: str):
+        app = state.webapps.get(domain)
+
+        if app is None:
+            return self.send(404, {'detail': 'Not found.'})
+
+        if action == 'reload':
+            app['reloads'] += 1
+        else:
+            app['enabled'] = action == 'enable'
+
+        self.send(200, {'status': 'OK'})
+
+    def list_static(self, state: FakeState, domain: str, kind: str):
+        app = state.webapps.get(domain)
+
+        if app is None:
+            return self.send(404, {'detail': 'Not found.'})
+
+        self.send(200, list(app[kind].values()))
+
+    def create_static(self, state: FakeState, domain: str, kind: str):
+        app = state.webapps.get(domain)
+
+        if app is None:
+            return self.send(404, {'detail': 'Not found.'})
+
+        form = self.form()
+        entry = {'id': next(state.ids), **{field: form.get(field) for field in STATIC_FIELDS[kind]}}
+        app[kind][entry['id']] = entry
+
+        self.send(201, entry)
+
+    def get_static(self, state: FakeState, domain: str, kind: str, id: str):
+        entry = state.webapps.get(domain, {}).get(kind, {}).get(int(id))
+
+        if entry is None:
+            return self.send(404, {'detail': 'Not found.'})
+
+        self.send(200, entry)
+
+    def delete_static(self, state: FakeState, domain: str, kind: str, id: str):
+        if state.webapps.get(domain, {}).get(kind, {}).pop(int(id), None) is None:
+            return self.send(404, {'detail': 'Not found.'})
+
+        self.send(204)
+
+    def csrf_cookie(self) -> tuple:
+        token = self.cookies().get('csrftoken') or secrets.token_hex(32)
+
+        return token, ('Set-Cookie', f'csrftoken={token}; Path=/')
+
+    def login_page(self, state: FakeState, error: str = ''):
+        token, cookie = self.csrf_cookie()
+
+        self.send(200, LOGIN_PAGE.format(token=token, error=error), 'text/html', (cookie,))
+
+    def login(self, state: FakeState):
+        form = self.form()
+
+        if form.get('csrfmiddlewaretoken') != self.cookies().get('csrftoken'):
+            return self.send(403, 'CSRF verification failed.', 'text/html')
+
+        if form.get('auth-username') != state.username or str(form.get('auth-password')) != state.password:
+            return self.login_page(state, LOGIN_ERROR)
+
+        session = secrets.token_hex(16)
+        expires = datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(days=14)
+
+        with state.lock:
+            state.sessions.add(session)
+
+        cookie = f"sessionid={session}; Path=/; HttpOnly; expires={expires.strftime('%a, %d %b %Y %H:%M:%S GMT')}"
+        self.send(200, '<html><body>Dashboard</body></html>', 'text/html', (('Set-Cookie', cookie),))
+
+    def logout(self, state: FakeState):
+        with state.lock:
+            state.sessions.discard(self.cookies().get('sessionid'))
+
+        self.send(302, headers=(('Location', '/'), ('Set-Cookie', 'sessionid=""; Path=/; Max-Age=0')))
+
+    def authenticated(self, state: FakeState, user: str) -> bool:
+        if self.cookies().get('sessionid') in state.sessions and user == state.username:
+            return True
+
+        self.send(302, headers=(('Location', f'/login/?next={quote(self.path)}'),))
+
+        return False
+
+    def csrf_valid(self) -> bool:
+        if self.form().get('csrfmiddlewaretoken') == self.cookies().get('csrftoken'):
+            return True
+
+        self.send(403, 'CSRF verification failed.', 'text/html')
+
+        return False
+
+    def webapps_page(self, state: FakeState, user: str):
+        if not self.authenticated(state, user):
+            return
+
+        token, cookie = self.csrf_cookie()
+
+        with state.lock:
+            panes = '\n'.join(
+                APP_PANE.format(
+                    pane=domain.replace('.', '_'), user=user, domain=domain, token=token,
+                    expiry=app['expiry'].strftime(EXPIRY_FORMAT), action='disable' if app['enabled'] else 'enable'
+                )
+                for domain, app in state.webapps.items()
+            )
+
+        self.send(200, f'<html><body><div class="tab-content">{panes}</div></body></html>', 'text/html', (cookie,))
+
+    def web_reload(self, state: FakeState, user: str, domain: str):
+        if not self.authenticated(state, user) or not self.csrf_valid():
+            return
+
+        with state.lock:
+            app = state.webapps.get(domain)
+
+            if app is None:
+                return self.send(404, 'Not found', 'text/html')
+
+            app['reloads'] += 1
+
+        self.send(200, 'OK', 'text/plain')
+
+    def web_extend(self, state: FakeState, user: str, domain: str):
+        if not self.authenticated(state, user) or not self.csrf_valid():
+            return
+
+        with state.lock:
+            app = state.webapps.get(domain)
+
+            if app is None:
+                return self.send(404, 'Not found', 'text/html')
+
+            app['expiry'] = datetime.date.today() + datetime.timedelta(days=90)
+
+        self.send(200, '<html><body>Extended</body></html>', 'text/html')
+
+    def web_extend_task(self, state: FakeState, user: str, id: str):
+        if not self.authenticated(state, user) or not self.csrf_valid():
+            return
+
+        with state.lock:
+            task = state.tasks.get(int(id))
+
+            if task is None:
+                return self.send(404, {'status': 'error'})
+
+            task['expiry'] = (datetime.date.today() + datetime.timedelta(days=30)).isoformat()
+
+        self.send(200, {'status': 'success'})
+
+
+class FakeServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+
+class FakePythonAnywhere:
+    def __init__(self, username: str = 'user', password: str = 'password', token: str = 'token',
+                 latency=0, error_rate: float = 0, error_status: int = 503, rate_limit: tuple = None,
+                 seed: int = None, compress: bool = False):
+        self.state = FakeState(username, password, token)
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.rate_limit = rate_limit
+        self.compress = compress
+
+        self.routes = [(method, re.compile(f'{pattern}$'), name) for method, pattern, name in ROUTES]
+        self.random = random.Random(seed)
+        self.buckets = {}
+        self.injected = []
+        self.truncations = []
+        self.requests = {}
+        self.lock = threading.Lock()
+
+        self.server = None
+        self.thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+
+        return f'http://{host}:{port}'
+
+    def start(self, host: str = '127.0.0.1', port: int = 0) -> 'FakePythonAnywhere':
+        self.server = FakeServer((host, port), FakeHandler)
+        self.server.fake = self
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+        return self
+
+    def stop(self):
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def attach(self, client):
+        if hasattr(client, 'base_url'):
+            client.base_url = f'{self.url}/api/v0/user/{client.username}'
+        else:
+            client.BASE_URL = self.url
+
+        return client
+
+    def inject(self, status: int = 503, count: int = 1, endpoint: str = None, retry_after: float = None):
+        with self.lock:
+            self.injected.extend([(endpoint, status, retry_after)] * count)
+
+    def truncate(self, after: int = 1024, count: int = 1, endpoint: str = None):
+        with self.lock:
+            self.truncations.extend([(endpoint, after)] * count)
+
+    def truncation(self, name: str):
+        with self.lock:
+            for index, (endpoint, after) in enumerate(self.truncations):
+                if endpoint in (None, name):
+                    del self.truncations[index]
+
+                    return after
+
+        return None
+
+    def route(self, method: str, path: str):
+        for route_method, pattern, name in self.routes:
+            if route_method == method:
+                match = pattern.match(path)
+
+                if match:
+                    return name, match.groupdict()
+
+        return None
+
+    def count(self, name: str):
+        with self.lock:
+            self.requests[name] = self.requests.get(name, 0) + 1
+
+    def wait(self):
+        latency = self.latency() if callable(self.latency) else self.latency
+
+        if isinstance(latency, tuple):
+            latency = self.random.uniform(*latency)
+
+        if latency:
+            time.sleep(latency)
+
+    def failure(self, name: str, client: str):
+        with self.lock:
+            for index, (endpoint, status, retry_after) in enumerate(self.injected):
+                if endpoint in (None, name):
+                    del self.injected[index]
+                    headers = (('Retry-After', str(retry_after)),) if retry_after is not None else ()
+
+                    return status, {'detail': 'Injected failure.'}, 'application/json', headers
+
+            if self.error_rate and self.random.random() < self.error_rate:
+                return self.error_status, {'detail': 'Injected failure.'}
+
+            if self.rate_limit:
+                bucket = self.buckets.get(client)
+
+                if bucket is None:
+                    bucket = self.buckets[client] = TokenBucket(*self.rate_limit)
+
+                delay = bucket.wait_time()
+
+                if delay:
+                    return 429, {'detail': 'Request was throttled.'}, 'application/json', (
+                        ('Retry-After', str(max(1, round(delay)))),
+                    )
+
+                bucket.reserve()
+
+        return None
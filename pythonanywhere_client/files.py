@@ -0,0 +1,141 @@
+import asyncio
+import binascii
+import contextlib
+import io
+import os
+import time
+
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+
+
+@contextlib.contextmanager
+def open_destination(destination):
+    if isinstance(destination, (str, os.PathLike)):
+        with open(destination, 'wb') as file:
+            yield file
+    else:
+        yield destination
+
+
+def content_length(response):
+    try:
+        return int(response.headers['Content-Length'])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def decoded_length(response):
+    if response.headers.get('Content-Encoding', 'identity') != 'identity':
+        return None
+
+    return content_length(response)
+
+
+def iter_response(response, chunk_size: int = DEFAULT_CHUNK_SIZE):
+    try:
+        yield from response.iter_content(chunk_size=chunk_size)
+    finally:
+        response.close()
+
+
+async def aiter_response(response, chunk_size: int = DEFAULT_CHUNK_SIZE):
+    try:
+        async for chunk in response.aiter_bytes(chunk_size):
+            yield chunk
+    finally:
+        await response.aclose()
+
+
+def upload_size(content):
+    if isinstance(content, os.PathLike):
+        return os.path.getsize(content)
+
+    if hasattr(content, 'read'):
+        try:
+            if not content.seekable():
+                return None
+
+            position = content.tell()
+            size = content.seek(0, io.SEEK_END) - position
+            content.seek(position)
+
+            return size
+        except (AttributeError, OSError):
+            return None
+
+    try:
+        return memoryview(content).nbytes
+    except TypeError:
+        return None
+
+
+def iter_upload(content, chunk_size: int = DEFAULT_CHUNK_SIZE):
+    if isinstance(content, os.PathLike):
+        with open(content, 'rb') as file:
+            yield from iter_upload(file, chunk_size)
+
+    elif hasattr(content, 'read'):
+        while chunk := content.read(chunk_size):
+            yield chunk.encode('utf-8') if isinstance(chunk, str) else chunk
+
+    else:
+        try:
+            view = memoryview(content).cast('B')
+        except TypeError:
+            for chunk in content:
+                yield chunk.encode('utf-8') if isinstance(chunk, str) else chunk
+        else:
+            with view:
+                for offset in range(0, len(view), chunk_size):
+                    yield bytes(view[offset:offset + chunk_size])
+
+
+class MultipartUpload:
+    def __init__(self, content, chunk_size: int = DEFAULT_CHUNK_SIZE, progress=None, name: str = 'content'):
+        if isinstance(content, str):
+            content = content.encode('utf-8')
+
+        self.content = content
+        self.chunk_size = chunk_size
+        self.progress = progress
+        self.size = upload_size(content)
+
+        boundary = binascii.hexlify(os.urandom(16)).decode('ascii')
+
+        self.content_type = f'multipart/form-data; boundary={boundary}'
+        self.head = f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"; filename="{name}"\r\n\r\n'.encode()
+        self.tail = f'\r\n--{boundary}--\r\n'.encode()
+
+        if self.size is not None:
+            self.len = len(self.head) + self.size + len(self.tail)
+
+    @property
+    def headers(self) -> dict:
+        headers = {'Content-Type': self.content_type}
+
+        if self.size is not None:
+            headers['Content-Length'] = str(self.len)
+
+        return headers
+
+    def __iter__(self):
+        started = time.monotonic()
+        sent = 0
+
+        yield self.head
+
+        for chunk in iter_upload(self.content, self.chunk_size):
+            yield chunk
+
+            sent += len(chunk)
+
+            if self.progress:
+                self.progress(sent, self.size, sent / max(time.monotonic() - started, 1e-6))
+
+        yield self.tail
+
+    async def __aiter__(self):
+        chunks = iter(self)
+
+        while (chunk := await asyncio.to_thread(next, chunks, None)) is not None:
+            yield chunk
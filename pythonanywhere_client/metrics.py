@@ -0,0 +1,156 @@
+import bisect
+import functools
+import re
+import threading
+from urllib.parse import urlsplit
+
+from pythonanywhere_client.files import content_length
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+WEB_ROUTES = (
+    ('web_login', 'GET', '/login/'),
+    ('web_login', 'POST', '/login/'),
+    ('web_logout', 'POST', '/logout/'),
+    ('web_webapps_page', 'GET', '/user/{username}/webapps/'),
+    ('web_reload_app', 'POST', '/user/{username}/webapps/{app_name}.pythonanywhere.com/reload'),
+    ('web_extend_app', 'POST', '/user/{username}/webapps/{app_name}.pythonanywhere.com/extend'),
+    ('web_extend_task', 'POST', '/user/{username}/schedule/task/{task_id}/extend'),
+)
+
+
+def route_pattern(uri: str):
+    pattern = re.sub(r'\\{(\w+)\\}', '[^/]+', re.escape(uri))
+
+    return re.compile(f'{pattern}$')
+
+
+ROUTES = tuple((method, route_pattern(uri), name) for name, method, uri in WEB_ROUTES)
+
+
+@functools.lru_cache(maxsize=1024)
+def endpoint_label(method: str, url: str) -> str:
+    path = urlsplit(url).path
+
+    for route_method, pattern, name in ROUTES:
+        if route_method == method and pattern.match(path):
+            return name
+
+    return 'other'
+
+
+def response_size(response, stream: bool = False) -> int:
+    if stream:
+        return content_length(response) or 0
+
+    return len(response.content)
+
+
+class EndpointStats:
+    def __init__(self, buckets: tuple):
+        self.buckets = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.seconds = 0.0
+        self.bytes = 0
+        self.retries = 0
+        self.statuses = {}
+        self.exceptions = {}
+
+    def to_dict(self, buckets: tuple) -> dict:
+        return {
+            'count': self.count,
+            'seconds': self.seconds,
+            'bytes': self.bytes,
+            'retries': self.retries,
+            'statuses': dict(self.statuses),
+            'exceptions': dict(self.exceptions),
+            'buckets': dict(zip(buckets + (float('inf'),), self.buckets)),
+        }
+
+
+class Metrics:
+    def __init__(self, buckets: tuple = DEFAULT_BUCKETS):
+        self.bucket_bounds = tuple(buckets)
+        self.stats = {}
+        self.lock = threading.Lock()
+
+    def record(self, endpoint: str, region: str, seconds: float, status_code: int = None, size: int = 0,
+               retries: int = 0, exception: str = None):
+        bucket = bisect.bisect_left(self.bucket_bounds, seconds)
+
+        with self.lock:
+            stats = self.stats.get((endpoint, region))
+
+            if stats is None:
+                stats = self.stats[(endpoint, region)] = EndpointStats(self.bucket_bounds)
+
+            stats.buckets[bucket] += 1
+            stats.count += 1
+            stats.seconds += seconds
+            stats.bytes += size
+            stats.retries += retries
+
+            if status_code is not None:
+                stats.statuses[status_code] = stats.statuses.get(status_code, 0) + 1
+
+            if exception is not None:
+                stats.exceptions[exception] = stats.exceptions.get(exception, 0) + 1
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            return {
+                region: {
+                    endpoint: stats.to_dict(self.bucket_bounds)
+                    for (endpoint, stats_region), stats in sorted(self.stats.items()) if stats_region == region
+                }
+                for region in sorted({region for _, region in self.stats})
+            }
+
+    def clear(self):
+        with self.lock:
+            self.stats.clear()
+
+    def to_prometheus(self, prefix: str = 'pythonanywhere_client') -> str:
+        lines = [
+            f'# HELP {prefix}_request_duration_seconds Request latency per endpoint.',
+            f'# TYPE {prefix}_request_duration_seconds histogram',
+        ]
+
+        with self.lock:
+            items = sorted(self.stats.items())
+            counters = []
+
+            for (endpoint, region), stats in items:
+                labels = f'endpoint="{endpoint}",region="{region}"'
+                cumulative = 0
+
+                for bound, count in zip(self.bucket_bounds + (float('inf'),), stats.buckets):
+                    cumulative += count
+                    le = '+Inf' if bound == float('inf') else repr(float(bound))
+                    lines.append(f'{prefix}_request_duration_seconds_bucket{{{labels},le="{le}"}} {cumulative}')
+
+                lines.append(f'{prefix}_request_duration_seconds_sum{{{labels}}} {stats.seconds}')
+                lines.append(f'{prefix}_request_duration_seconds_count{{{labels}}} {stats.count}')
+
+                counters.append(('response_bytes_total', labels, stats.bytes))
+                counters.append(('retries_total', labels, stats.retries))
+                counters.extend(
+                    ('responses_total', f'{labels},status="{status}"', count)
+                    for status, count in sorted(stats.statuses.items())
+                )
+                counters.extend(
+                    ('exceptions_total', f'{labels},exception="{name}"', count)
+                    for name, count in sorted(stats.exceptions.items())
+                )
+
+        for name, help_text in (
+            ('response_bytes_total', 'Response body bytes per endpoint.'),
+            ('retries_total', 'Retried attempts per endpoint.'),
+            ('responses_total', 'Responses per endpoint and status code.'),
+            ('exceptions_total', 'Failed requests per endpoint and exception type.'),
+        ):
+            lines.append(f'# HELP {prefix}_{name} {help_text}')
+            lines.append(f'# TYPE {prefix}_{name} counter')
+            lines.extend(f'{prefix}_{name}{{{labels}}} {value}' for counter, labels, value in counters if counter == name)
+
+        return '\n'.join(lines) + '\n'
@@ -0,0 +1,91 @@
+import re
+import threading
+import time
+
+DEFAULT_LIMITS = {
+    'consoles': (40, 60),
+    'files': (40, 60),
+    'schedule': (40, 60),
+    'webapps': (40, 60),
+    'default': (40, 60),
+}
+
+FAMILY_PATTERN = re.compile(r'/api/v0/user/[^/]+/([^/?]+)')
+
+
+def endpoint_family(url: str) -> str:
+    result = FAMILY_PATTERN.search(url)
+
+    if result:
+        return result.group(1)
+
+    return url.strip('/').split('/')[0].split('?')[0] or 'default'
+
+
+class TokenBucket:
+    def __init__(self, requests: int, period: float):
+        self.rate = requests / period
+        self.capacity = requests
+        self.tokens = float(requests)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, tokens: int = 1) -> float:
+        with self.lock:
+            self._refill()
+
+            return max((tokens - self.tokens) / self.rate, 0)
+
+    def reserve(self, tokens: int = 1) -> float:
+        with self.lock:
+            self._refill()
+            self.tokens -= tokens
+
+            return max(-self.tokens / self.rate, 0)
+
+    def acquire(self, tokens: int = 1):
+        delay = self.reserve(tokens)
+
+        if delay:
+            time.sleep(delay)
+
+
+class RateLimiter:
+    accounts = {}
+    accounts_lock = threading.Lock()
+
+    def __init__(self, limits: dict = None):
+        self.limits = {**DEFAULT_LIMITS, **(limits or {})}
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    @classmethod
+    def shared(cls, username: str, region: str = 'us', limits: dict = None) -> 'RateLimiter':
+        with cls.accounts_lock:
+            key = (username, region)
+
+            if key not in cls.accounts:
+                cls.accounts[key] = cls(limits)
+
+            return cls.accounts[key]
+
+    def bucket(self, family: str) -> TokenBucket:
+        with self.lock:
+            if family not in self.buckets:
+                self.buckets[family] = TokenBucket(*self.limits.get(family, self.limits['default']))
+
+            return self.buckets[family]
+
+    def wait_time(self, family: str) -> float:
+        return self.bucket(family).wait_time()
+
+    def reserve(self, url: str) -> float:
+        return self.bucket(endpoint_family(url)).reserve()
+
+    def acquire(self, url: str):
+        self.bucket(endpoint_family(url)).acquire()
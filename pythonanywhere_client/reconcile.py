@@ -0,0 +1,174 @@
+from pythonanywhere_client.batch import map_batch
+from pythonanywhere_client.response import Response
+
+TASK_FIELDS = ('command', 'description', 'hour', 'minute', 'enabled', 'interval')
+
+
+def normalize_task(task: dict) -> dict:
+    task = {
+        'command': task['command'],
+        'description': task.get('description'),
+        'hour': task.get('hour'),
+        'minute': task['minute'],
+        'enabled': task.get('enabled', True),
+        'interval': task.get('interval', 'daily'),
+    }
+
+    if task['interval'] == 'hourly':
+        task['hour'] = None
+
+    return task
+
+
+def task_changes(current: dict, desired: dict) -> dict:
+    changes = {}
+
+    for field in TASK_FIELDS:
+        if desired[field] is None or desired[field] == current.get(field):
+            continue
+
+        if field == 'hour' and desired['interval'] == 'hourly':
+            continue
+
+        changes[field] = desired[field]
+
+    return changes
+
+
+def diff_tasks(current: list, desired: list, delete: bool = True):
+    remaining = {task['id']: task for task in current}
+    unmatched = []
+    unchanged = []
+
+    for task in map(normalize_task, desired):
+        match = next((id for id, existing in remaining.items() if not task_changes(existing, task)), None)
+
+        if match is None:
+            unmatched.append(task)
+        else:
+            unchanged.append(remaining.pop(match))
+
+    creates = []
+    updates = []
+
+    for task in unmatched:
+        match = next((id for id, existing in remaining.items() if existing['command'] == task['command']), None)
+
+        if match is None:
+            creates.append(task)
+        else:
+            existing = remaining.pop(match)
+            updates.append((existing, task_changes(existing, task)))
+
+    deletes = list(remaining.values()) if delete else []
+
+    return creates, updates, deletes, unchanged
+
+
+def reconcile_tasks(api, desired: list, workers: int = 8, delete: bool = True) -> Response:
+    tasks = api.request('get_tasks', cached=False)
+
+    if tasks.error:
+        return tasks
+
+    creates, updates, deletes, unchanged = diff_tasks(tasks.data, desired, delete)
+
+    calls = [
+        ('create_task', task['command'], task['description'], task['hour'], task['minute'], task['enabled'],
+         task['interval'])
+        for task in creates
+    ]
+    calls.extend(
+        ('update_task', task['id'], *(changes.get(field) for field in TASK_FIELDS)) for task, changes in updates
+    )
+    calls.extend(('delete_task', task['id']) for task in deletes)
+
+    responses = map_batch(api, calls, workers)
+    created = responses[:len(creates)]
+    updated = responses[len(creates):len(creates) + len(updates)]
+    deleted = responses[len(creates) + len(updates):]
+
+    failed = [
+        {'call': call[0], 'arguments': call[1:], 'response': response.to_dict()}
+        for call, response in zip(calls, responses) if response.error
+    ]
+
+    return Response(
+        error=bool(failed),
+        data={
+            'created': [response.data for response in created if not response.error],
+            'updated': [task['id'] for (task, _), response in zip(updates, updated) if not response.error],
+            'deleted': [task['id'] for task, response in zip(deletes, deleted) if not response.error],
+            'unchanged': [task['id'] for task in unchanged],
+            'failed': failed
+        }
+    )
+
+
+STATIC_KINDS = {
+    'static_paths': (('url', 'path'), 'get_static_paths', 'create_static_path', 'delete_static_path'),
+    'static_headers': (('url', 'name', 'value'), 'get_static_headers', 'create_static_header', 'delete_static_header'),
+}
+
+
+def diff_static(current: list, desired: list, fields: tuple):
+    wanted = {tuple(str(entry[field]) for field in fields) for entry in desired}
+    existing = {}
+    deletes = []
+
+    for entry in current:
+        key = tuple(str(entry[field]) for field in fields)
+
+        if key in wanted and key not in existing:
+            existing[key] = entry
+        else:
+            deletes.append(entry)
+
+    creates = [entry for entry in desired if tuple(str(entry[field]) for field in fields) not in existing]
+
+    return creates, deletes, list(existing.values())
+
+
+def reconcile_static(api, desired: dict, workers: int = 8, reload: bool = True) -> Response:
+    lookups = [(app_name, kind) for app_name, config in desired.items() for kind in STATIC_KINDS if kind in config]
+    current = map_batch(
+        api, [('request', STATIC_KINDS[kind][1], {'app_name': app_name}, False) for app_name, kind in lookups], workers
+    )
+
+    results = {app_name: {'created': [], 'deleted': [], 'unchanged': 0, 'reloaded': False, 'failed': []}
+               for app_name in desired}
+    deletes = []
+    creates = []
+
+    for (app_name, kind), response in zip(lookups, current):
+        if response.error:
+            results[app_name]['failed'].append({'call': STATIC_KINDS[kind][1], 'response': response.to_dict()})
+            continue
+
+        fields, _, create, delete = STATIC_KINDS[kind]
+        created, deleted, unchanged = diff_static(response.data, desired[app_name][kind], fields)
+
+        creates.extend((app_name, (create, app_name, *(entry[field] for field in fields))) for entry in created)
+        deletes.extend((app_name, (delete, app_name, entry['id'])) for entry in deleted)
+        results[app_name]['unchanged'] += len(unchanged)
+
+    for jobs, key in ((deletes, 'deleted'), (creates, 'created')):
+        for (app_name, call), response in zip(jobs, map_batch(api, [call for _, call in jobs], workers)):
+            if response.error:
+                results[app_name]['failed'].append({'call': call[0], 'arguments': call[1:], 'response': response.to_dict()})
+            else:
+                results[app_name][key].append(response.data if key == 'created' else call[2])
+
+    changed = [app_name for app_name, result in results.items() if result['created'] or result['deleted']]
+
+    if reload:
+        for app_name, response in zip(changed, map_batch(api, [('reload_app', app_name) for app_name in changed], workers)):
+            if response.error:
+                results[app_name]['failed'].append({'call': 'reload_app', 'response': response.to_dict()})
+            else:
+                results[app_name]['reloaded'] = True
+
+    return Response(
+        error=any(result['failed'] for result in results.values()),
+        data=results
+    )
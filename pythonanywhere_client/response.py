@@ -0,0 +1,68 @@
+import json
+import traceback
+from typing import Union, Optional
+
+
+def decode_body(content: bytes, encoding: str = None):
+    try:
+        return json.loads(content)
+    except ValueError:
+        if not content:
+            return None
+
+        return {'text': content.decode(encoding or 'utf-8', 'replace')}
+
+
+def response_data(response):
+    return decode_body(response.content, response.encoding)
+
+
+class Response:
+    __slots__ = ('status_code', 'error', 'body', 'encoding', 'exception', '_data')
+
+    def __init__(self, status_code: Optional[int] = 200, error: Optional[bool] = False,
+                 data: Optional[Union[dict, list, tuple, None]] = None, body: bytes = None, encoding: str = None,
+                 exception: BaseException = None):
+        self.status_code = status_code
+        self.error = error
+        self.body = body
+        self.encoding = encoding
+        self.exception = exception
+        self._data = data
+
+    @classmethod
+    def from_http(cls, response, error: bool) -> 'Response':
+        return cls(status_code=response.status_code, error=error, body=response.content, encoding=response.encoding)
+
+    @property
+    def data(self):
+        if self.body is not None:
+            self._data = decode_body(self.body, self.encoding)
+            self.body = None
+        elif self.exception is not None and self._data is None:
+            self._data = {'message': ''.join(traceback.format_exception(self.exception))}
+
+        return self._data
+
+    @data.setter
+    def data(self, value):
+        self._data = value
+        self.body = None
+
+    def to_dict(self):
+        return {
+            'status_code': self.status_code,
+            'error': self.error,
+            'data': self.data
+        }
+
+    def __eq__(self, other):
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+
+        return (self.status_code, self.error, self.data) == (other.status_code, other.error, other.data)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f'Response(status_code={self.status_code!r}, error={self.error!r}, data={self.data!r})'
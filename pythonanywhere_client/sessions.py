@@ -0,0 +1,77 @@
+import json
+import os
+import tempfile
+import time
+from urllib.parse import urlsplit
+
+from requests.cookies import create_cookie
+
+DEFAULT_SESSION_DIR = os.path.join('~', '.cache', 'pythonanywhere-client', 'sessions')
+SESSION_COOKIE = 'sessionid'
+
+
+def dump_cookies(jar) -> list:
+    return [
+        {
+            'name': cookie.name,
+            'value': cookie.value,
+            'domain': cookie.domain,
+            'path': cookie.path,
+            'expires': cookie.expires,
+            'secure': cookie.secure,
+        }
+        for cookie in jar
+    ]
+
+
+def live_cookies(cookies: list, now: float = None) -> list:
+    now = time.time() if now is None else now
+
+    return [cookie for cookie in cookies if cookie.get('expires') is None or cookie['expires'] > now]
+
+
+def session_valid(cookies: list, margin: float = 60) -> bool:
+    return any(cookie['name'] == SESSION_COOKIE for cookie in live_cookies(cookies, time.time() + margin))
+
+
+def load_cookies(jar, cookies: list):
+    for cookie in live_cookies(cookies):
+        jar.set_cookie(create_cookie(**cookie))
+
+
+def redirected_to_login(response) -> bool:
+    return urlsplit(response.url).path == '/login/' and bool(response.history)
+
+
+class FileSessionStore:
+    def __init__(self, directory: str = DEFAULT_SESSION_DIR):
+        self.directory = os.path.expanduser(directory)
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, f'{key}.json')
+
+    def load(self, key: str):
+        try:
+            with open(self.path(key)) as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return None
+
+    def save(self, key: str, cookies: list):
+        os.makedirs(self.directory, mode=0o700, exist_ok=True)
+        descriptor, temporary = tempfile.mkstemp(prefix=f'{key}.', suffix='.tmp', dir=self.directory)
+
+        try:
+            with open(descriptor, 'w') as file:
+                json.dump(cookies, file)
+
+            os.replace(temporary, self.path(key))
+        except BaseException:
+            os.remove(temporary)
+            raise
+
+    def delete(self, key: str):
+        try:
+            os.remove(self.path(key))
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,140 @@
+import fnmatch
+import hashlib
+import json
+import os
+import pathlib
+import posixpath
+
+from pythonanywhere_client.batch import map_batch
+from pythonanywhere_client.files import DEFAULT_CHUNK_SIZE
+from pythonanywhere_client.response import Response
+
+MANIFEST_NAME = '.pythonanywhere-sync.json'
+
+
+def file_hash(path: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> str:
+    digest = hashlib.sha256()
+
+    with open(path, 'rb') as file:
+        while chunk := file.read(chunk_size):
+            digest.update(chunk)
+
+    return digest.hexdigest()
+
+
+def load_manifest(path: str, remote_root: str) -> dict:
+    try:
+        with open(path) as file:
+            manifest = json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+    if manifest.get('remote_root') != remote_root:
+        return {}
+
+    return manifest.get('files', {})
+
+
+def save_manifest(path: str, remote_root: str, files: dict):
+    temporary = f'{path}.tmp'
+
+    with open(temporary, 'w') as file:
+        json.dump({'remote_root': remote_root, 'files': files}, file, indent=1, sort_keys=True)
+
+    os.replace(temporary, path)
+
+
+def scan_local(local_root: str, manifest: dict, exclude: tuple = ()):
+    files = {}
+    failed = {}
+
+    for directory, _, names in os.walk(local_root):
+        for name in names:
+            path = os.path.join(directory, name)
+            relative = os.path.relpath(path, local_root).replace(os.sep, '/')
+
+            if any(fnmatch.fnmatch(relative, pattern) for pattern in exclude):
+                continue
+
+            try:
+                stat = os.stat(path)
+                previous = manifest.get(relative)
+
+                if previous and previous['size'] == stat.st_size and previous['mtime'] == stat.st_mtime_ns:
+                    digest = previous['sha256']
+                else:
+                    digest = file_hash(path)
+            except OSError as exception:
+                failed[relative] = Response(status_code=None, error=True, exception=exception)
+                continue
+
+            files[relative] = {'size': stat.st_size, 'mtime': stat.st_mtime_ns, 'sha256': digest}
+
+    return files, failed
+
+
+def remote_files(api, remote_root: str, workers: int = 8):
+    walk = api.walk_remote(remote_root, workers=workers)
+    files = {path for path in walk if not path.endswith('/')}
+
+    if walk.failed:
+        return None
+
+    return files
+
+
+def sync_dir(api, local_root: str, remote_root: str, manifest_path: str = None, workers: int = 8,
+             delete: bool = True, exclude: tuple = ()) -> Response:
+    remote_root = remote_root.rstrip('/')
+    manifest_path = manifest_path or os.path.join(local_root, MANIFEST_NAME)
+    exclude = (*exclude, os.path.relpath(manifest_path, local_root).replace(os.sep, '/'))
+
+    manifest = load_manifest(manifest_path, remote_root)
+    local, unreadable = scan_local(local_root, manifest, exclude)
+    remote = remote_files(api, remote_root, workers)
+
+    def remote_path(relative):
+        return posixpath.join(remote_root, relative)
+
+    def changed(relative, entry):
+        if manifest.get(relative, {}).get('sha256') != entry['sha256']:
+            return True
+
+        return remote is not None and remote_path(relative) not in remote
+
+    uploads = [relative for relative, entry in local.items() if changed(relative, entry)]
+    deletions = [relative for relative in manifest if relative not in local and relative not in unreadable] if delete else []
+
+    calls = [('create_file', remote_path(relative), pathlib.Path(local_root, relative)) for relative in uploads]
+    calls.extend(('delete_file', remote_path(relative)) for relative in deletions)
+
+    responses = map_batch(api, calls, workers)
+    uploaded = dict(zip(uploads, responses))
+    deleted = dict(zip(deletions, responses[len(uploads):]))
+
+    failed = {relative: response.to_dict() for relative, response in unreadable.items()}
+    synced = {relative: entry for relative, entry in local.items() if relative not in uploaded}
+    synced.update((relative, manifest[relative]) for relative in unreadable if relative in manifest)
+
+    for relative, response in uploaded.items():
+        if response.error:
+            failed[relative] = response.to_dict()
+        else:
+            synced[relative] = local[relative]
+
+    for relative, response in deleted.items():
+        if response.error and response.status_code != 404:
+            failed[relative] = response.to_dict()
+            synced[relative] = manifest[relative]
+
+    save_manifest(manifest_path, remote_root, synced)
+
+    return Response(
+        error=bool(failed),
+        data={
+            'uploaded': [relative for relative, response in uploaded.items() if not response.error],
+            'deleted': [relative for relative, response in deleted.items() if relative not in failed],
+            'unchanged': len(local) - len(uploads),
+            'failed': failed
+        }
+    )
@@ -0,0 +1,138 @@
+import email.utils
+import itertools
+import random
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from pythonanywhere_client.metrics import endpoint_label, response_size
+
+IDEMPOTENT_METHODS = frozenset({'GET', 'HEAD', 'PUT', 'DELETE', 'OPTIONS', 'TRACE'})
+RETRY_STATUSES = frozenset({429, 502, 503, 504})
+BACKOFF_MAX = 60
+
+
+class TimeoutSession(requests.Session):
+    def __init__(self, timeout=10, rate_limiter=None, metrics=None, region: str = 'us'):
+        super().__init__()
+        self.timeout = timeout
+        self.rate_limiter = rate_limiter
+        self.metrics = metrics
+        self.region = region
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault('timeout', self.timeout)
+
+        if self.rate_limiter:
+            self.rate_limiter.acquire(url)
+
+        if self.metrics is None:
+            return super().request(method, url, **kwargs)
+
+        stream = kwargs.get('stream', False)
+        started = time.perf_counter()
+
+        try:
+            response = super().request(method, url, **kwargs)
+        except requests.exceptions.RequestException as exception:
+            self.metrics.record(
+                endpoint_label(method, url), self.region, time.perf_counter() - started,
+                exception=type(exception).__name__
+            )
+            raise
+
+        retries = getattr(response.raw, 'retries', None)
+
+        self.metrics.record(
+            endpoint_label(method, url), self.region, time.perf_counter() - started, response.status_code,
+            response_size(response, stream), len(retries.history) if retries else 0
+        )
+
+        return response
+
+
+class JitteredRetry(Retry):
+    def get_backoff_time(self) -> float:
+        errors = len(list(itertools.takewhile(lambda entry: entry.redirect_location is None, reversed(self.history))))
+
+        if errors <= 1:
+            return 0
+
+        return backoff_delay(errors - 1, self.backoff_factor)
+
+    def get_retry_after(self, response):
+        delay = super().get_retry_after(response)
+
+        return None if delay is None else min(delay, BACKOFF_MAX)
+
+
+def create_retry(retries: int = 3, backoff_factor: float = 0.5) -> Retry:
+    return JitteredRetry(
+        total=retries,
+        connect=retries,
+        read=retries,
+        status=retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=IDEMPOTENT_METHODS,
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+
+
+def create_adapter(pool_size: int = 10, retries: int = 3, backoff_factor: float = 0.5) -> HTTPAdapter:
+    return HTTPAdapter(
+        pool_connections=pool_size,
+        pool_maxsize=pool_size,
+        max_retries=create_retry(retries, backoff_factor)
+    )
+
+
+def create_session(headers: dict, timeout=10, pool_size: int = 10, retries: int = 3,
+                   backoff_factor: float = 0.5, rate_limiter=None, metrics=None, region: str = 'us',
+                   adapter: HTTPAdapter = None) -> TimeoutSession:
+    session = TimeoutSession(timeout, rate_limiter, metrics, region)
+    session.headers = headers
+
+    adapter = adapter or create_adapter(pool_size, retries, backoff_factor)
+
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+
+    return session
+
+
+def clone_session(session: TimeoutSession) -> TimeoutSession:
+    clone = TimeoutSession(session.timeout, session.rate_limiter, session.metrics, session.region)
+    clone.headers = session.headers.copy()
+
+    for prefix, adapter in session.adapters.items():
+        clone.mount(prefix, adapter)
+
+    return clone
+
+
+def parse_retry_after(value: str):
+    if not value:
+        return None
+
+    try:
+        return min(max(float(value), 0), BACKOFF_MAX)
+    except ValueError:
+        pass
+
+    try:
+        return min(max(email.utils.parsedate_to_datetime(value).timestamp() - time.time(), 0), BACKOFF_MAX)
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt: int, backoff_factor: float = 0.5, retry_after: str = None) -> float:
+    delay = parse_retry_after(retry_after)
+
+    if delay is None:
+        delay = min(backoff_factor * 2 ** attempt, BACKOFF_MAX) + random.uniform(0, backoff_factor)
+
+    return delay
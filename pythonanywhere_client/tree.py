@@ -0,0 +1,125 @@
+import fnmatch
+import posixpath
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from pythonanywhere_client.batch import BatchRunner
+
+TREE_LIMIT = 1000
+
+
+def matches(relative: str, patterns: tuple) -> bool:
+    name = posixpath.basename(relative)
+
+    return any(fnmatch.fnmatch(relative, pattern) or fnmatch.fnmatch(name, pattern) for pattern in patterns)
+
+
+class TreeWalk:
+    def __init__(self, root: str, include: tuple = (), exclude: tuple = (), max_depth: int = None,
+                 workers: int = 8):
+        self.root = root.rstrip('/') + '/'
+        self.include = tuple(include)
+        self.exclude = tuple(exclude)
+        self.max_depth = max_depth
+        self.workers = workers
+
+        self.pending = [self.root]
+        self.failed = {}
+
+    def relative(self, path: str) -> str:
+        return path[len(self.root):].rstrip('/')
+
+    def depth(self, relative: str) -> int:
+        return relative.count('/') + 1 if relative else 0
+
+    def descend(self, relative: str) -> bool:
+        return not matches(relative, self.exclude) and (self.max_depth is None or self.depth(relative) < self.max_depth)
+
+    def visible(self, relative: str) -> bool:
+        if matches(relative, self.exclude) or (self.max_depth is not None and self.depth(relative) > self.max_depth):
+            return False
+
+        return not self.include or matches(relative, self.include)
+
+    def truncated(self, response) -> bool:
+        return not response.error and isinstance(response.data, list) and len(response.data) >= TREE_LIMIT
+
+    def fetch(self, api, directory: str):
+        response = api.get_dir(directory)
+
+        if self.truncated(response):
+            return api.list_dir(directory)
+
+        return response
+
+    def expand(self, directory: str, response) -> list:
+        if response.error or not isinstance(response.data, (list, dict)):
+            self.failed[directory] = response
+            return []
+
+        if isinstance(response.data, dict):
+            paths = [
+                f"{directory}{name}{'/' if entry.get('type') == 'directory' else ''}"
+                for name, entry in response.data.items()
+            ]
+        else:
+            paths = response.data
+
+        base = self.relative(directory)
+        complete = isinstance(response.data, list) and len(paths) < TREE_LIMIT
+        entries = []
+        directories = set()
+
+        for path in paths:
+            relative = self.relative(path)
+
+            if not path.startswith(directory) or not relative or relative == base:
+                continue
+
+            parts = relative.split('/')
+            parents = ['/'.join(parts[:index]) for index in range(len(base.split('/')) + 1 if base else 1, len(parts))]
+
+            if not all(self.descend(parent) for parent in parents):
+                continue
+
+            if not complete and parents:
+                directories.add(parents[0])
+                continue
+
+            if path.endswith('/') and not complete:
+                directories.add(relative)
+
+            if self.visible(relative):
+                entries.append(path)
+
+        for relative in sorted(directories):
+            if self.descend(relative):
+                self.pending.append(f'{self.root}{relative}/')
+
+        return entries
+
+
+class RemoteWalk(TreeWalk):
+    def __init__(self, api, root: str, **kwargs):
+        super().__init__(root, **kwargs)
+        self.api = api
+
+    def fetch_worker(self, runner: BatchRunner, directory: str):
+        return self.fetch(runner.worker_api(), directory)
+
+    def __iter__(self):
+        runner = BatchRunner(self.api)
+        executor = ThreadPoolExecutor(max_workers=self.workers)
+        running = {}
+
+        try:
+            while self.pending or running:
+                while self.pending and len(running) < self.workers:
+                    directory = self.pending.pop()
+                    running[executor.submit(self.fetch_worker, runner, directory)] = directory
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    yield from self.expand(running.pop(future), future.result())
+        finally:
+            executor.shutdown(cancel_futures=True)
@@ -0,0 +1,44 @@
+import datetime
+import re
+
+EXPIRY_FORMAT = '%A %d %B %Y'
+
+TOKEN_PATTERN = re.compile(
+    r'<div class="tab-pane[^"]*"[^>]*?\sid="id_(?P<pane>[\w-]+)"'
+    r'|<p class="webapp_expiry">'
+    r'|<strong>(?P<strong>[^<]*)</strong>'
+    r'|action="[^"]*/(?P<action>enable|disable)/?"'
+)
+
+
+def parse_expiry_date(value: str) -> datetime.date:
+    return datetime.datetime.strptime(value.strip(), EXPIRY_FORMAT).date()
+
+
+def parse_webapps_page(text: str) -> dict:
+    apps = {}
+    app = None
+    expiry = False
+
+    for token in TOKEN_PATTERN.finditer(text):
+        if token.group('pane'):
+            domain = token.group('pane').replace('_', '.')
+            app = apps[domain] = {'domain': domain, 'expiry': None, 'status': None}
+            expiry = False
+
+        elif app is None:
+            continue
+
+        elif token.group('action'):
+            app['status'] = 'enabled' if token.group('action') == 'disable' else 'disabled'
+
+        elif token.group('strong') is not None:
+            if expiry and app['expiry'] is None:
+                app['expiry'] = token.group('strong')
+
+            expiry = False
+
+        else:
+            expiry = True
+
+    return apps
@@ -55,3 +55,18 @@ def api(constants):
     p.create_session(constants['USER_AGENT'], constants['PA_TIMEOUT'])
 
     yield p
+
+
+@pytest.fixture
+def async_api(constants):
+    from pythonanywhere_client.aio import AsyncPythonAnywhereApi
+
+    p = AsyncPythonAnywhereApi(
+        os.environ.get('PA_USERNAME'),
+        os.environ.get('PA_TOKEN'),
+        os.environ.get('PA_REGION'),
+    )
+
+    p.create_session(constants['USER_AGENT'], constants['PA_TIMEOUT'])
+
+    return p
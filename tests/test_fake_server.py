@@ -0,0 +1,372 @@
+import asyncio
+import io
+import tarfile
+import threading
+import time
+
+import pytest
+
+from pythonanywhere_client import (
+    FileSessionStore, Metrics, PythonAnywhereApi, PythonAnywhereWeb, Response, ResponseCache
+)
+from pythonanywhere_client.aio import AsyncPythonAnywhereApi
+from pythonanywhere_client.fake import FakePythonAnywhere
+
+
+@pytest.fixture(scope='module')
+def fake():
+    with FakePythonAnywhere(username='user', password='password', token='token', seed=1) as server:
+        yield server
+
+
+@pytest.fixture
+def fake_api(fake):
+    api = fake.attach(PythonAnywhereApi('user', 'token'))
+    api.create_session('test', retries=0)
+
+    yield api
+
+    fake.latency = 0
+    fake.rate_limit = None
+    fake.buckets.clear()
+    fake.injected.clear()
+    fake.truncations.clear()
+
+
+@pytest.fixture
+def fake_web(fake):
+    web = fake.attach(PythonAnywhereWeb('user', 'password'))
+    web.create_session('test', retries=0)
+    web.login()
+
+    return web
+
+
+def test_console_lifecycle(fake_api):
+    create_console = fake_api.create_console()
+    assert isinstance(create_console, Response)
+    assert create_console.status_code == 201
+
+    console_input = fake_api.console_input(create_console.data['id'], 'echo 1\n')
+    assert not console_input.error
+    assert fake_api.console_latest_output(create_console.data['id']).data['output'] == 'echo 1\n'
+
+    assert not fake_api.delete_console(create_console.data['id']).error
+    assert fake_api.console_latest_output(create_console.data['id']).status_code == 404
+
+
+def test_tail_console(fake_api):
+    console_id = fake_api.create_console().data['id']
+    fake_api.console_input(console_id, 'before\n')
+
+    tail = fake_api.tail_console(console_id, from_start=False, timeout=5, min_interval=0.05)
+    fake_api.console_input(console_id, 'after\n')
+    assert next(tail) == 'after\n'
+
+    fake_api.delete_console(console_id)
+    error = next(tail)
+    assert isinstance(error, Response)
+    assert error.status_code == 404
+    assert next(tail, None) is None
+
+
+def test_files_and_walk(fake_api):
+    assert fake_api.create_file('/home/user/app/main.py', b'print(1)').status_code == 201
+    assert fake_api.create_file('/home/user/app/main.py', b'print(2)').status_code == 200
+    assert fake_api.get_file('/home/user/app/main.py').data['content'] == 'cHJpbnQoMik='
+
+    assert fake_api.get_dir('/home/user/app/').data == ['/home/user/app/main.py']
+    assert fake_api.list_dir('/home/user/').data['app']['type'] == 'directory'
+    assert '/home/user/app/main.py' in list(fake_api.walk_remote('/home/user/'))
+
+    assert fake_api.delete_file('/home/user/app/').status_code == 204
+    assert fake_api.get_file('/home/user/app/main.py').status_code == 404
+
+
+class PipeWriter:
+    def __init__(self):
+        self.buffer = io.BytesIO()
+
+    def write(self, data: bytes) -> int:
+        return self.buffer.write(data)
+
+    def seekable(self) -> bool:
+        return False
+
+    def tell(self):
+        raise io.UnsupportedOperation('tell')
+
+    def seek(self, *args):
+        raise io.UnsupportedOperation('seek')
+
+
+def test_download_tree_gzip_response(fake, fake_api, tmp_path):
+    content = bytes(range(256)) * 47
+    fake.compress = True
+    fake_api.create_file('/home/user/gzip/data.bin', content)
+
+    try:
+        assert fake_api.session.get(fake_api.create_url('/files/path/home/user/gzip/data.bin')).headers[
+            'Content-Encoding'] == 'gzip'
+
+        archive = fake_api.download_tree('/home/user/gzip/', tmp_path / 'tree.tar', chunk_size=1024)
+        assert not archive.error
+
+        with tarfile.open(tmp_path / 'tree.tar') as tar:
+            assert tar.extractfile('data.bin').read() == content
+
+        download = fake_api.download_tree('/home/user/gzip/', tmp_path / 'tree', chunk_size=1024)
+        assert (tmp_path / 'tree' / 'data.bin').read_bytes() == content
+    finally:
+        fake.compress = False
+
+    resumed = fake_api.download_tree('/home/user/gzip/', tmp_path / 'tree', chunk_size=1024)
+    assert resumed.data['skipped'] == download.data['downloaded']
+
+
+def test_download_tree_non_seekable(fake_api):
+    fake_api.create_file('/home/user/pipe/a.txt', b'a' * 5000)
+    destination = PipeWriter()
+
+    download = fake_api.download_tree('/home/user/pipe/', destination, archive='tar', chunk_size=1024)
+    assert not download.error
+
+    with tarfile.open(fileobj=io.BytesIO(destination.buffer.getvalue())) as tar:
+        assert tar.extractfile('a.txt').read() == b'a' * 5000
+
+
+def test_download_tree_interrupted_stream(fake, fake_api, tmp_path):
+    files = {'big.bin': bytes(range(256)) * 64, 'ok.txt': b'ok' * 3000, 'small.txt': b'small'}
+
+    for name, content in files.items():
+        fake_api.create_file(f'/home/user/broken/{name}', content)
+
+    fake.truncate(after=1000, endpoint='get_file')
+    download = fake_api.download_tree('/home/user/broken/', tmp_path / 'tree.tar', workers=2, chunk_size=1024)
+
+    assert download.error
+    assert len(download.data['failed']) == 1
+
+    with tarfile.open(tmp_path / 'tree.tar') as tar:
+        assert sorted(tar.getnames()) == sorted(name.rsplit('/', 1)[1] for name in download.data['downloaded'])
+
+        for name in tar.getnames():
+            assert tar.extractfile(name).read() == files[name]
+
+
+def test_sync_dir_large_tree(fake, fake_api, tmp_path):
+    for index in range(1100):
+        (tmp_path / f'{index:04}.css').write_bytes(b'body {}')
+
+    first = fake_api.sync_dir(str(tmp_path), '/home/user/large')
+    assert len(first.data['uploaded']) == 1100
+
+    second = fake_api.sync_dir(str(tmp_path), '/home/user/large')
+    assert second.data['uploaded'] == []
+
+    fake.state.remove_path('/home/user/large/1099.css')
+    third = fake_api.sync_dir(str(tmp_path), '/home/user/large')
+    assert third.data['uploaded'] == ['1099.css']
+
+
+def test_sync_dir_dangling_symlink(fake, fake_api, tmp_path):
+    (tmp_path / 'index.html').write_bytes(b'<html></html>')
+    (tmp_path / 'broken.css').symlink_to(tmp_path / 'missing.css')
+
+    sync = fake_api.sync_dir(str(tmp_path), '/home/user/symlink')
+    assert sync.error
+    assert sync.data['uploaded'] == ['index.html']
+    assert list(sync.data['failed']) == ['broken.css']
+    assert fake.state.files['/home/user/symlink/index.html'] == b'<html></html>'
+
+
+def test_tasks_and_static(fake, fake_api):
+    create_task = fake_api.create_task('echo 1', 'Test', 7, 0)
+    assert create_task.data['hour'] == 7
+
+    update_task = fake_api.update_task(create_task.data['id'], minute=30, enabled=False)
+    assert update_task.data['minute'] == 30
+    assert update_task.data['enabled'] is False
+
+    reconcile = fake_api.reconcile_tasks([{'command': 'echo 1', 'hour': 7, 'minute': 30, 'enabled': False}])
+    assert reconcile.data['unchanged'] == [create_task.data['id']]
+
+    static = fake_api.reconcile_static({'user': {'static_paths': [{'url': '/static/', 'path': '/home/user/static'}]}})
+    assert not static.error
+    assert static.data['user']['reloaded']
+    assert fake.state.webapps['user.pythonanywhere.com']['static_files']
+
+
+def test_reconcile_tasks_bypasses_cache(fake, fake_api):
+    cached_api = fake.attach(PythonAnywhereApi('user', 'token', cache=ResponseCache()))
+    cached_api.create_session('test', retries=0)
+    assert not cached_api.get_tasks().error
+
+    task = fake_api.create_task('echo stale', 'Stale', 1, 0).data
+    reconcile = cached_api.reconcile_tasks([{'command': 'echo stale', 'hour': 2, 'minute': 0}], delete=False)
+
+    assert reconcile.data['created'] == []
+    assert reconcile.data['updated'] == [task['id']]
+    assert cached_api.get_tasks().data == fake_api.get_tasks().data
+
+
+def test_reconcile_static_bypasses_cache(fake, fake_api):
+    fake.state.add_webapp('stale.pythonanywhere.com')
+    cached_api = fake.attach(PythonAnywhereApi('user', 'token', cache=ResponseCache()))
+    cached_api.create_session('test', retries=0)
+    assert cached_api.get_static_paths('stale').data == []
+
+    path = fake_api.create_static_path('stale', '/old/', '/home/user/old').data
+    reconcile = cached_api.reconcile_static({'stale': {'static_paths': []}}, reload=False)
+
+    assert not reconcile.error
+    assert reconcile.data['stale']['deleted'] == [path['id']]
+    assert fake_api.get_static_paths('stale').data == []
+
+
+def test_metrics_endpoint_names(fake, fake_web):
+    metrics = Metrics()
+    api = fake.attach(PythonAnywhereApi('user', 'token'))
+    api.create_session('test', retries=0, metrics=metrics)
+    api.create_file('/home/user/metrics/a.txt', b'a')
+
+    assert not api.list_dir('/home/user/metrics/').error
+    assert not api.get_file('/home/user/metrics/a.txt').error
+    assert not api.stream_file('/home/user/metrics/a.txt').error
+    assert not api.batch([('get_tasks',)] * 3, workers=3).error
+
+    fake_web.create_session('test', retries=0, metrics=metrics)
+    fake_web.login()
+
+    snapshot = metrics.snapshot()['us']
+    assert {name: stats['count'] for name, stats in snapshot.items()} == {
+        'create_file': 1, 'list_dir': 1, 'get_file': 1, 'stream_file': 1, 'get_tasks': 3, 'web_login': 2
+    }
+
+
+def test_invalid_token(fake):
+    api = fake.attach(PythonAnywhereApi('user', 'wrong'))
+    api.create_session('test', retries=0)
+
+    assert api.list_consoles().status_code == 401
+
+
+def test_web_login_and_webapps(fake, fake_web):
+    overview = fake_web.get_webapps_overview()
+    assert not overview.error
+    assert overview.data['user.pythonanywhere.com']['expiry_date'] is not None
+
+    assert not fake_web.reload_app('user').error
+    assert not fake_web.extend_app('user').error
+
+
+def test_web_extend_all_apps_refreshes_token_once(fake, fake_web):
+    apps = [f'bulk{index}' for index in range(6)]
+
+    for app in apps:
+        fake.state.add_webapp(f'{app}.pythonanywhere.com')
+
+    fake_web.cached_csrf_token = 'invalid'
+    pages = fake.requests.get('webapps_page', 0)
+
+    extend = fake_web.extend_all_apps(apps, workers=6)
+    assert not extend.error
+    assert fake.requests['webapps_page'] == pages + 1
+
+
+def test_web_relogin(fake, fake_web):
+    login_count = fake_web.login_count
+    fake.state.sessions.clear()
+
+    assert not fake_web.get_app_expiry_date('user').error
+    assert fake_web.login_count == login_count + 1
+
+
+def test_web_login_with_broken_session_store(fake, tmp_path):
+    (tmp_path / 'sessions').write_text('not a directory')
+    web = fake.attach(PythonAnywhereWeb('user', 'password', session_store=FileSessionStore(str(tmp_path / 'sessions'))))
+    web.create_session('test', retries=0)
+
+    assert not web.login().error
+
+
+def test_web_wrong_password(fake):
+    web = fake.attach(PythonAnywhereWeb('user', 'wrong'))
+    web.create_session('test', retries=0)
+
+    assert web.login().data == {'message': 'The user name or password is incorrect'}
+
+
+def test_injected_errors(fake, fake_api):
+    fake.inject(503, count=2, endpoint='get_tasks')
+
+    assert fake_api.get_tasks().status_code == 503
+    assert fake_api.list_consoles().status_code == 200
+    assert fake_api.get_tasks().status_code == 503
+    assert fake_api.get_tasks().status_code == 200
+
+
+def test_rate_limit(fake, fake_api):
+    fake.rate_limit = (3, 60)
+
+    status_codes = [fake_api.list_consoles().status_code for _ in range(5)]
+    assert status_codes == [200, 200, 200, 429, 429]
+
+
+def test_latency(fake, fake_api):
+    fake.latency = 0.05
+
+    start = time.perf_counter()
+    batch = fake_api.batch([('list_consoles',)] * 8, workers=8)
+    elapsed = time.perf_counter() - start
+
+    assert not batch.error
+    assert 0.05 <= elapsed < 0.4
+
+
+def test_async_api(fake):
+    async def run():
+        async_api = fake.attach(AsyncPythonAnywhereApi('user', 'token'))
+        async_api.create_session('test', retries=0)
+
+        async with async_api:
+            create_file = await async_api.create_file('/home/user/async.txt', b'async')
+            assert create_file.status_code == 201
+
+            get_file = await async_api.get_file('/home/user/async.txt')
+            assert get_file.data['content'] == 'YXN5bmM='
+
+    asyncio.run(run())
+
+
+class ThreadRecorder(io.BytesIO):
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.threads = set()
+
+    def read(self, *args):
+        self.threads.add(threading.get_ident())
+        return super().read(*args)
+
+    def write(self, data):
+        self.threads.add(threading.get_ident())
+        return super().write(data)
+
+    def close(self):
+        pass
+
+
+def test_async_upload_and_download_off_loop(fake):
+    async def run():
+        async_api = fake.attach(AsyncPythonAnywhereApi('user', 'token'))
+        async_api.create_session('test', retries=0)
+        source, destination = ThreadRecorder(b'x' * 5000), ThreadRecorder()
+
+        async with async_api:
+            assert (await async_api.create_file('/home/user/async/io.bin', source, chunk_size=1024)).status_code == 201
+            assert not (await async_api.download_file('/home/user/async/io.bin', destination, chunk_size=1024)).error
+
+        assert destination.getvalue() == b'x' * 5000
+        assert threading.get_ident() not in source.threads | destination.threads
+
+    asyncio.run(run())
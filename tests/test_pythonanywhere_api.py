@@ -1,6 +1,15 @@
+import subprocess
 import uuid
+import zipfile
 
-from pythonanywhere_client import decode_file_content
+from urllib3 import HTTPResponse
+
+from pythonanywhere_client import Metrics, PythonAnywhereFleet, RateLimiter, Response, ResponseCache, decode_file_content
+from pythonanywhere_client.console import CommandMarker, new_output
+from pythonanywhere_client.endpoints import ENDPOINTS, create_call
+from pythonanywhere_client.metrics import endpoint_label
+from pythonanywhere_client.ratelimit import TokenBucket
+from pythonanywhere_client.transport import BACKOFF_MAX, backoff_delay, create_retry
 
 
 def test_create_list_delete_console(api):
@@ -48,6 +57,38 @@ def test_create_get_delete_file(api, constants):
     assert not delete_file.error
 
 
+def test_update_task(api, constants):
+    task = api.create_task(*constants['TASK'])
+    assert not task.error
+
+    update = api.update_task(task.data['id'], minute=30, enabled=False)
+    assert not update.error
+    assert update.data['id'] == task.data['id']
+    assert update.data['minute'] == 30
+    assert update.data['enabled'] is False
+
+    api.delete_task(task.data['id'])
+
+
+def test_reconcile_tasks(api, constants):
+    command, description, hour, minute, enabled = constants['TASK']
+    desired = [{'command': command, 'description': description, 'hour': hour, 'minute': minute}]
+
+    created = api.reconcile_tasks(desired)
+    assert not created.error
+    assert len(created.data['created']) == 1
+
+    unchanged = api.reconcile_tasks(desired)
+    assert unchanged.data['unchanged'] == [created.data['created'][0]['id']]
+    assert not unchanged.data['created'] and not unchanged.data['updated']
+
+    updated = api.reconcile_tasks([{**desired[0], 'minute': minute + 1}])
+    assert updated.data['updated'] == [created.data['created'][0]['id']]
+
+    deleted = api.reconcile_tasks([])
+    assert deleted.data['deleted'] == [created.data['created'][0]['id']]
+
+
 def test_can_create_tasks(api):
     can_create_tasks = api.can_create_tasks()
 
@@ -157,6 +198,407 @@ def test_create_list_get_delete_static_path(api, constants):
     assert not delete_path.error
 
 
+def test_reconcile_static(api, constants):
+    app_name = constants['PA_APP_NAME']
+    desired = {app_name: {
+        'static_paths': [{'url': '/test-static/', 'path': f"/home/{constants['PA_USERNAME']}/test-static"}],
+        'static_headers': [{'url': '/test-static/', 'name': 'X-Test', 'value': 'value'}],
+    }}
+
+    applied = api.reconcile_static(desired)
+    assert not applied.error
+    assert len(applied.data[app_name]['created']) == 2
+    assert applied.data[app_name]['reloaded']
+
+    unchanged = api.reconcile_static(desired)
+    assert not unchanged.data[app_name]['created'] and not unchanged.data[app_name]['deleted']
+    assert not unchanged.data[app_name]['reloaded']
+
+    for created in applied.data[app_name]['created']:
+        if 'path' in created:
+            api.delete_static_path(app_name, created['id'])
+        else:
+            api.delete_static_header(app_name, created['id'])
+
+
 def test_get_dir(api, constants):
     get_dir = api.get_dir(f"/home/{constants['PA_APP_NAME']}")
     assert not get_dir.error
+
+
+def test_walk_remote(api, constants):
+    root = f"/home/{constants['PA_USERNAME']}"
+
+    walk = api.walk_remote(root, max_depth=1)
+    paths = list(walk)
+    assert not walk.failed
+    assert paths
+    assert all(path.startswith(f'{root}/') and path[len(root) + 1:].rstrip('/').count('/') == 0 for path in paths)
+
+    assert not any(path.endswith('.bashrc') for path in api.walk_remote(root, exclude=('.bashrc',), max_depth=1))
+    assert all(path.endswith('.py') for path in api.walk_remote(root, include=('*.py',), max_depth=2))
+
+
+def test_stream_download_file(api, constants, tmp_path):
+    create_file = api.create_file(constants['FILE_PATH'], constants['FILE_CONTENT'])
+    assert not create_file.error
+
+    stream_file = api.stream_file(constants['FILE_PATH'], chunk_size=4)
+    assert not stream_file.error
+    assert b''.join(stream_file.data['chunks']) == constants['FILE_CONTENT']
+
+    destination = tmp_path / 'download.txt'
+    download_file = api.download_file(constants['FILE_PATH'], destination)
+    assert not download_file.error
+    assert download_file.data['size'] == len(constants['FILE_CONTENT'])
+    assert destination.read_bytes() == constants['FILE_CONTENT']
+
+    delete_file = api.delete_file(constants['FILE_PATH'])
+    assert not delete_file.error
+
+
+def test_download_tree(api, constants, tmp_path):
+    root = f"/home/{constants['PA_USERNAME']}/.test-tree"
+    files = {'a.txt': b'a' * 10, 'sub/b.txt': b'b' * 100000}
+
+    for name, content in files.items():
+        assert not api.create_file(f'{root}/{name}', content).error
+
+    download = api.download_tree(root, tmp_path / 'tree')
+    assert not download.error
+    assert all((tmp_path / 'tree' / name).read_bytes() == content for name, content in files.items())
+
+    resumed = api.download_tree(root, tmp_path / 'tree')
+    assert len(resumed.data['skipped']) == len(files)
+
+    archive = api.download_tree(root, tmp_path / 'tree.zip')
+    assert not archive.error
+    assert zipfile.ZipFile(tmp_path / 'tree.zip').read('sub/b.txt') == files['sub/b.txt']
+
+    for name in files:
+        api.delete_file(f'{root}/{name}')
+
+
+def test_create_file_streaming(api, constants, tmp_path):
+    source = tmp_path / 'upload.txt'
+    source.write_bytes(constants['FILE_CONTENT'])
+    progress = []
+
+    create_file = api.create_file(constants['FILE_PATH'], source, chunk_size=4,
+                                  progress=lambda *args: progress.append(args))
+    assert not create_file.error
+    assert progress[-1][:2] == (len(constants['FILE_CONTENT']), len(constants['FILE_CONTENT']))
+
+    get_file = api.get_file(constants['FILE_PATH'])
+    assert constants['FILE_CONTENT'] == decode_file_content(get_file.data['content'])
+
+    chunks = iter([constants['FILE_CONTENT'][:4], constants['FILE_CONTENT'][4:]])
+    create_file = api.create_file(constants['FILE_PATH'], chunks)
+    assert not create_file.error
+
+    get_file = api.get_file(constants['FILE_PATH'])
+    assert constants['FILE_CONTENT'] == decode_file_content(get_file.data['content'])
+
+    delete_file = api.delete_file(constants['FILE_PATH'])
+    assert not delete_file.error
+
+
+def test_sync_dir(api, constants, tmp_path):
+    remote_root = f"/home/{constants['PA_USERNAME']}/.test_sync"
+    (tmp_path / 'static').mkdir()
+    (tmp_path / 'static' / 'app.css').write_bytes(constants['FILE_CONTENT'])
+    (tmp_path / 'index.html').write_bytes(constants['FILE_CONTENT'])
+
+    sync = api.sync_dir(str(tmp_path), remote_root)
+    assert not sync.error
+    assert sorted(sync.data['uploaded']) == ['index.html', 'static/app.css']
+
+    sync = api.sync_dir(str(tmp_path), remote_root)
+    assert not sync.error
+    assert sync.data['uploaded'] == []
+    assert sync.data['unchanged'] == 2
+
+    (tmp_path / 'index.html').unlink()
+    (tmp_path / 'static' / 'app.css').unlink()
+
+    sync = api.sync_dir(str(tmp_path), remote_root)
+    assert not sync.error
+    assert sorted(sync.data['deleted']) == ['index.html', 'static/app.css']
+
+
+def test_batch(api, constants):
+    paths = [f"{constants['FILE_PATH']}.{index}" for index in range(4)]
+
+    created = api.batch([('create_file', path, constants['FILE_CONTENT']) for path in paths])
+    assert not created.error
+    assert len(created.data) == len(paths)
+
+    results = dict(api.batch_as_completed([('get_file', path) for path in paths]))
+    assert sorted(results) == list(range(len(paths)))
+    assert all(decode_file_content(result.data['content']) == constants['FILE_CONTENT'] for result in results.values())
+
+    deleted = api.batch([('delete_file', path) for path in paths] + [('delete_file', paths[0])])
+    assert deleted.error
+    assert [result['error'] for result in deleted.data] == [False] * len(paths) + [True]
+
+
+def test_fleet(api, constants):
+    fleet = PythonAnywhereFleet([(api.username, api.token, api.region)], workers=4, per_account=2)
+    fleet.create_session(constants['USER_AGENT'], constants['PA_TIMEOUT'])
+
+    list_consoles = fleet.list_consoles()
+    assert not list_consoles.error
+    assert list(list_consoles.data) == [api.username]
+
+    tasks = fleet.run_calls({api.username: [('get_tasks',), ('can_create_tasks',)]})
+    assert not tasks.error
+    assert len(tasks.data[api.username]) == 2
+
+    fleet.close()
+
+
+def test_create_session_transport(api, constants):
+    api.create_session(constants['USER_AGENT'], (5, 30), pool_size=4, retries=2)
+    adapter = api.session.get_adapter(api.base_url)
+
+    assert api.session.timeout == (5, 30)
+    assert adapter._pool_maxsize == 4
+    assert adapter.max_retries.total == 2
+    assert 429 in adapter.max_retries.status_forcelist
+    assert 'POST' not in adapter.max_retries.allowed_methods
+
+    api.create_session(constants['USER_AGENT'], constants['PA_TIMEOUT'])
+
+
+def test_retry_jitter():
+    retry = create_retry(5, 1)
+
+    for _ in range(3):
+        retry = retry.increment('GET', '/', error=ConnectionError())
+
+    delays = {retry.get_backoff_time() for _ in range(20)}
+    assert all(4 <= delay < 5 for delay in delays)
+    assert len(delays) > 1
+    assert type(retry.new()) is type(retry)
+
+
+def test_retry_after_capped():
+    assert backoff_delay(0, 0.5, '3600') == BACKOFF_MAX
+    assert backoff_delay(0, 0.5, 'Wed, 21 Oct 2099 07:28:00 GMT') == BACKOFF_MAX
+    assert backoff_delay(0, 0.5, '2') == 2
+
+    retry = create_retry()
+    assert retry.get_retry_after(HTTPResponse(headers={'Retry-After': '3600'}, status=503)) == BACKOFF_MAX
+    assert retry.get_retry_after(HTTPResponse(headers={'Retry-After': '2'}, status=503)) == 2
+
+
+def test_rate_limiter(api, constants):
+    limiter = RateLimiter.shared(constants['PA_USERNAME'], constants['PA_REGION'])
+    assert limiter is RateLimiter.shared(constants['PA_USERNAME'], constants['PA_REGION'])
+
+    api.create_session(constants['USER_AGENT'], constants['PA_TIMEOUT'], rate_limiter=limiter)
+    assert api.rate_limit_wait('consoles') == 0
+
+    list_consoles = api.list_consoles()
+    assert not list_consoles.error
+
+    api.create_session(constants['USER_AGENT'], constants['PA_TIMEOUT'])
+    assert api.rate_limit_wait('consoles') == 0
+
+
+def test_token_bucket():
+    bucket = TokenBucket(2, 1)
+
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == 0
+    assert 0 < bucket.reserve() <= 0.5
+    assert bucket.wait_time() > 0.5
+
+
+def test_response_cache(api, constants):
+    api.cache = ResponseCache(ttls={'get_tasks': 60})
+
+    tasks = api.get_tasks()
+    assert not tasks.error
+    assert api.get_tasks().data == tasks.data
+
+    task = api.create_task(*constants['TASK'])
+    assert len(api.get_tasks().data) == len(tasks.data) + 1
+
+    api.delete_task(task.data['id'])
+    assert len(api.get_tasks().data) == len(tasks.data)
+
+    api.cache = None
+
+
+def test_response_cache_eviction():
+    cache = ResponseCache(max_bytes=64)
+
+    cache.set(('get_tasks', '', ()), Response(data=['a' * 20]))
+    cache.set(('get_dir', '', ('/home',)), Response(data=['b' * 20]))
+    assert cache.get(('get_tasks', '', ())).data == ['a' * 20]
+
+    cache.set(('list_consoles', '', ()), Response(data=['c' * 20]))
+    assert cache.get(('get_dir', '', ('/home',))) is None
+    assert cache.get(('get_tasks', '', ())) is not None
+
+    cache.set(('get_static_headers', '', ('app',)), Response(data=[]))
+    cache.invalidate('get_static_headers', scope=('app',))
+    assert cache.get(('get_static_headers', '', ('app',))) is None
+
+
+def test_response_cache_in_flight_invalidation():
+    cache = ResponseCache()
+    read = create_call('https://example.com/alice', 'get_tasks')
+
+    generation = cache.generation(read)
+    cache.update(create_call('https://example.com/alice', 'create_task'), Response(status_code=201, data={}))
+    cache.update(read, Response(status_code=200, data=['stale']), generation)
+    assert cache.lookup(read) is None
+
+    cache.update(read, Response(status_code=200, data=['fresh']), cache.generation(read))
+    assert cache.lookup(read).data == ['fresh']
+
+
+def test_response_cache_accounts():
+    cache = ResponseCache()
+    alice = create_call('https://example.com/alice', 'get_tasks')
+    bob = create_call('https://example.com/bob', 'get_tasks')
+
+    cache.update(alice, Response(status_code=200, data=['alice']))
+    assert cache.lookup(bob) is None
+
+    cache.update(bob, Response(status_code=200, data=['bob']))
+    cache.update(create_call('https://example.com/alice', 'delete_task', {'task_id': 1}), Response(status_code=204))
+    assert cache.lookup(alice) is None
+    assert cache.lookup(bob).data == ['bob']
+
+
+def test_middleware(api, constants):
+    calls = []
+
+    def record(call, handler):
+        response = handler(call)
+        calls.append((call.endpoint.name, response.status_code))
+        return response
+
+    handler = api.handler
+    api.add_middleware(record)
+
+    assert not api.get_tasks().error
+    assert not api.get_dir(f"/home/{constants['PA_USERNAME']}").error
+    assert calls == [('get_tasks', 200), ('get_dir', 200)]
+
+    api.middlewares.pop()
+    api.handler = handler
+
+
+def test_create_call():
+    call = create_call('https://example.com', 'get_dir', {'path': '/home/user'})
+
+    assert call.url == 'https://example.com/files/tree/'
+    assert call.kwargs == {'params': {'path': '/home/user'}}
+    assert call.key == ('get_dir', 'https://example.com', ('/home/user',))
+    assert set(ENDPOINTS['delete_task'].invalidates) == {'get_tasks'}
+
+
+def test_metrics(api, constants):
+    metrics = Metrics()
+    api.create_session(constants['USER_AGENT'], constants['PA_TIMEOUT'], metrics=metrics)
+
+    assert not api.get_tasks().error
+    assert api.get_file(constants['FILE_PATH'] + '.missing').error
+
+    snapshot = metrics.snapshot()[api.region]
+    assert snapshot['get_tasks']['count'] == 1
+    assert snapshot['get_tasks']['statuses'] == {200: 1}
+    assert snapshot['get_file']['statuses'] == {404: 1}
+    assert 'pythonanywhere_client_request_duration_seconds_count{endpoint="get_tasks"' in metrics.to_prometheus()
+
+    api.create_session(constants['USER_AGENT'], constants['PA_TIMEOUT'])
+
+
+def test_endpoint_label():
+    assert endpoint_label('GET', 'https://www.pythonanywhere.com/user/user/webapps/') == 'web_webapps_page'
+    assert endpoint_label('POST', 'https://www.pythonanywhere.com/user/user/webapps/app.pythonanywhere.com/reload') \
+        == 'web_reload_app'
+    assert endpoint_label('GET', 'https://www.pythonanywhere.com/unknown/') == 'other'
+
+
+def test_response_lazy_data():
+    response = Response(status_code=200, body=b'{"id": 1}')
+    assert response.body == b'{"id": 1}'
+    assert response.to_dict() == {'status_code': 200, 'error': False, 'data': {'id': 1}}
+    assert response.body is None
+
+    try:
+        raise ValueError('broken')
+    except ValueError as exception:
+        failure = Response(status_code=None, error=True, exception=exception)
+
+    assert failure.data['message'].startswith('Traceback')
+    assert failure.data['message'].strip().endswith('ValueError: broken')
+    assert Response(body=b'').data is None
+    assert Response(body=b'<html>').data == {'text': '<html>'}
+
+
+def test_tail_console(api, web):
+    string = uuid.uuid4().hex
+
+    create_console = api.create_console()
+    assert not create_console.error
+
+    start_console = web.start_console(create_console.data['id'])
+    assert not start_console.error
+
+    tail = api.tail_console(create_console.data['id'], from_start=False, timeout=30, min_interval=0.2)
+
+    api.console_input(create_console.data['id'], f'echo {string}\n')
+    assert any(isinstance(output, str) and string in output for output in tail)
+
+    delete_console = api.delete_console(create_console.data['id'])
+    assert not delete_console.error
+
+
+def test_new_output():
+    assert new_output('$ ', '$ ls\na b\n$ ') == 'ls\na b\n$ '
+    assert new_output('line1\nline2\n$ ', 'line2\n$ echo hi\nhi\n$ ') == 'echo hi\nhi\n$ '
+    assert new_output('$ ', '$ ') == ''
+
+
+def test_command_marker():
+    commands = {
+        'echo one; false': ('one\n', 1),
+        'echo two # trailing comment': ('two\n', 0),
+        'cat <<EOF\nthree\nEOF': ('three\n', 0),
+        'sleep 0 &': ('', 0),
+    }
+
+    for command, (output, exit_code) in commands.items():
+        marker = CommandMarker(command)
+        marker.feed(subprocess.run(['bash'], input=marker.input, capture_output=True, text=True).stdout)
+
+        assert marker.result
+        assert marker.response().data == {'output': output, 'exit_code': exit_code}
+
+
+def test_run_command(api, web):
+    string = uuid.uuid4().hex
+
+    create_console = api.create_console()
+    assert not create_console.error
+
+    start_console = web.start_console(create_console.data['id'])
+    assert not start_console.error
+
+    run_command = api.run_command(create_console.data['id'], f'echo {string}', timeout=30)
+    assert not run_command.error
+    assert run_command.data['output'].strip() == string
+    assert run_command.data['exit_code'] == 0
+
+    run_command = api.run_command(create_console.data['id'], 'false', timeout=30)
+    assert not run_command.error
+    assert run_command.data['exit_code'] == 1
+
+    delete_console = api.delete_console(create_console.data['id'])
+    assert not delete_console.error
@@ -0,0 +1,65 @@
+import asyncio
+
+from pythonanywhere_client import Response, decode_file_content
+
+
+def test_create_list_delete_console(async_api):
+    async def run():
+        async with async_api:
+            create_console = await async_api.create_console()
+            assert isinstance(create_console, Response)
+            assert not create_console.error
+
+            list_consoles = await async_api.list_consoles()
+            assert not list_consoles.error
+            assert len(list_consoles.data) > 0
+
+            delete_console = await async_api.delete_console(create_console.data['id'])
+            assert not delete_console.error
+
+    asyncio.run(run())
+
+
+def test_create_get_delete_file(async_api, constants):
+    async def run():
+        async with async_api:
+            create_file = await async_api.create_file(constants['FILE_PATH'], constants['FILE_CONTENT'])
+            assert not create_file.error
+
+            get_file = await async_api.get_file(constants['FILE_PATH'])
+            assert not get_file.error
+            assert constants['FILE_CONTENT'] == decode_file_content(get_file.data['content'])
+
+            delete_file = await async_api.delete_file(constants['FILE_PATH'])
+            assert not delete_file.error
+
+    asyncio.run(run())
+
+
+def test_concurrent_calls(async_api, constants):
+    async def run():
+        async with async_api:
+            responses = await asyncio.gather(
+                async_api.get_tasks(),
+                async_api.list_consoles(),
+                async_api.get_static_headers(constants['PA_APP_NAME']),
+                async_api.get_static_paths(constants['PA_APP_NAME']),
+            )
+
+            assert not any(response.error for response in responses)
+
+    asyncio.run(run())
+
+
+def test_walk_remote(async_api, constants):
+    async def run():
+        async with async_api:
+            root = f"/home/{constants['PA_USERNAME']}"
+            walk = async_api.walk_remote(root, max_depth=1)
+            paths = [path async for path in walk]
+
+            assert paths
+            assert not walk.failed
+            assert all(path.startswith(f'{root}/') for path in paths)
+
+    asyncio.run(run())
@@ -1,6 +1,16 @@
 import datetime
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 
-from pythonanywhere_client import PythonAnywhereWeb, add_months
+import pytest
+
+from pythonanywhere_client import FileSessionStore, PythonAnywhereWeb, add_months
+from pythonanywhere_client.browser import DriverPool
+from pythonanywhere_client.sessions import session_valid
+from pythonanywhere_client.webapps import parse_webapps_page
 
 
 def test_create_url(web):
@@ -59,6 +69,51 @@ def test_login(constants):
     assert not login.error
 
 
+def test_session_store(constants, tmp_path):
+    store = FileSessionStore(str(tmp_path))
+
+    web = PythonAnywhereWeb(constants['PA_USERNAME'], constants['PA_PASSWORD'], session_store=store)
+    web.create_session(constants['USER_AGENT'])
+    assert not web.ensure_login().error
+    assert session_valid(store.load(constants['PA_USERNAME']))
+
+    restored = PythonAnywhereWeb(constants['PA_USERNAME'], constants['PA_PASSWORD'], session_store=store)
+    restored.create_session(constants['USER_AGENT'])
+    assert restored.restore_session()
+    assert not restored.get_webapps_overview().error
+
+    restored.session.cookies.clear()
+    assert not restored.get_webapps_overview().error
+    assert restored.login_count == 1
+
+    assert not restored.logout().error
+    assert store.load(constants['PA_USERNAME']) is None
+
+
+def test_session_store_concurrent_saves(tmp_path):
+    store = FileSessionStore(str(tmp_path))
+    cookies = [{'name': 'sessionid', 'value': 'a', 'domain': '', 'path': '/', 'expires': None, 'secure': True}]
+
+    def save(_):
+        for _ in range(100):
+            store.save('user', cookies)
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        list(executor.map(save, range(4)))
+
+    assert store.load('user') == cookies
+    assert os.listdir(tmp_path) == ['user.json']
+    assert os.stat(store.path('user')).st_mode & 0o777 == 0o600
+
+
+def test_session_valid():
+    expires = time.time() + 3600
+
+    assert session_valid([{'name': 'sessionid', 'value': 'a', 'expires': expires}])
+    assert not session_valid([{'name': 'sessionid', 'value': 'a', 'expires': time.time() - 1}])
+    assert not session_valid([{'name': 'csrftoken', 'value': 'a', 'expires': expires}])
+
+
 def test_get_app_expiry_date(web, constants):
     expiry_date = web.get_app_expiry_date(constants['PA_APP_NAME'])
 
@@ -105,3 +160,121 @@ def test_start_console(api, web):
 
     delete_console = api.delete_console(create_console.data['id'])
     assert not delete_console.error
+
+
+def test_get_cached_csrf_token(web, constants):
+    csrf_token = web.get_cached_csrf_token()
+    assert not csrf_token.error
+    assert web.get_cached_csrf_token().data['csrf_token'] == csrf_token.data['csrf_token']
+
+    web.cached_csrf_token = 'invalid'
+    reload = web.reload_app(constants['PA_APP_NAME'])
+
+    assert not reload.error
+    assert web.cached_csrf_token != 'invalid'
+
+
+def test_extend_all_apps(web, constants):
+    extend = web.extend_all_apps([constants['PA_APP_NAME']])
+
+    assert not extend.error
+    assert not extend.data[constants['PA_APP_NAME']]['error']
+
+
+def test_extend_all_tasks(api, web, constants):
+    tasks = [api.create_task(*constants['TASK']).data['id'] for _ in range(2)]
+
+    extend = web.extend_all_tasks(tasks, workers=2)
+
+    for task_id in tasks:
+        api.delete_task(task_id)
+
+    assert not extend.error
+    assert sorted(extend.data) == sorted(tasks)
+
+
+def test_get_webapps_overview(web, constants):
+    overview = web.get_webapps_overview()
+    assert not overview.error
+
+    app = overview.data[f"{constants['PA_APP_NAME']}.pythonanywhere.com"]
+    assert app['expiry_date'] == web.get_app_expiry_date(constants['PA_APP_NAME']).data['expiry_date']
+
+
+def test_parse_webapps_page():
+    page = '''
+        <div class="tab-pane active" id="id_first_pythonanywhere_com">
+            <p class="webapp_expiry">This site will be disabled on <strong>Monday 01 January 2024</strong></p>
+            <form action="/user/user/webapps/first.pythonanywhere.com/disable/"></form>
+        </div>
+        <div class="tab-pane" id="id_second_pythonanywhere_com">
+            <strong>Not the expiry</strong>
+            <form action="/user/user/webapps/second.pythonanywhere.com/enable/"></form>
+        </div>
+        <div class="tab-pane" role="tabpanel" id="id_third_pythonanywhere_com">
+            <p class="webapp_expiry">This site will be disabled on <strong>Tuesday 02 January 2024</strong></p>
+        </div>
+    '''
+
+    apps = parse_webapps_page(page)
+
+    assert apps['first.pythonanywhere.com']['expiry'] == 'Monday 01 January 2024'
+    assert apps['first.pythonanywhere.com']['status'] == 'enabled'
+    assert apps['second.pythonanywhere.com']['expiry'] is None
+    assert apps['second.pythonanywhere.com']['status'] == 'disabled'
+    assert apps['third.pythonanywhere.com']['expiry'] == 'Tuesday 02 January 2024'
+
+
+def test_start_consoles_with_driver_pool(api, web):
+    consoles = [api.create_console().data['id'] for _ in range(2)]
+
+    pool = web.create_driver_pool(size=1, max_uses=5)
+
+    start_console = web.start_console(consoles[0])
+    assert not start_console.error
+
+    start_consoles = web.start_consoles(consoles)
+    assert not start_consoles.error
+    assert pool.created == 1
+
+    web.close_driver_pool()
+
+    for console_id in consoles:
+        api.delete_console(console_id)
+
+
+class FakeDriver:
+    def __init__(self):
+        self.quit_called = False
+
+    def execute_script(self, script):
+        return 1
+
+    def quit(self):
+        self.quit_called = True
+
+
+def test_driver_pool_close_with_checked_out_driver():
+    pool = DriverPool(FakeDriver, size=2)
+    idle = pool.acquire()
+    busy = pool.acquire()
+    pool.release(idle)
+
+    pool.close()
+    assert idle.quit_called
+    assert not busy.quit_called
+
+    pool.release(busy)
+    assert busy.quit_called
+    assert pool.idle.empty()
+    assert pool.created == 0
+
+    with pytest.raises(RuntimeError):
+        pool.acquire()
+
+
+def test_selenium_imported_lazily():
+    code = 'import sys, pythonanywhere_client; print("selenium" in sys.modules)'
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+
+    assert result.stdout.strip() == 'False'